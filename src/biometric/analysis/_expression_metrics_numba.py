@@ -0,0 +1,91 @@
+"""Numba-compiled kernels for per-frame expression and movement metrics."""
+import numba
+import numpy as np
+
+@numba.njit(cache=True)
+def _distance(landmarks, i, j):
+    """Euclidean distance between landmarks i and j."""
+    total = 0.0
+    for k in range(landmarks.shape[1]):
+        d = landmarks[i, k] - landmarks[j, k]
+        total += d * d
+    return total ** 0.5
+
+@numba.njit(cache=True)
+def _distance_between(a, b, i):
+    """Euclidean distance between landmark i of two landmark arrays."""
+    total = 0.0
+    for k in range(a.shape[1]):
+        d = a[i, k] - b[i, k]
+        total += d * d
+    return total ** 0.5
+
+@numba.njit(cache=True)
+def _eye_aspect_ratio(landmarks):
+    """Left eye aspect ratio (vertical/horizontal)."""
+    vertical = 0.5 * (_distance(landmarks, 160, 144) + _distance(landmarks, 158, 153))
+    horizontal = _distance(landmarks, 33, 133)
+    return vertical / (2.0 * horizontal) if horizontal > 0 else 0.0
+
+@numba.njit(cache=True)
+def _mouth_aspect_ratio(landmarks):
+    """Mouth aspect ratio (vertical/horizontal)."""
+    vertical = _distance(landmarks, 13, 14)
+    horizontal = _distance(landmarks, 78, 308)
+    return vertical / horizontal if horizontal > 0 else 0.0
+
+@numba.njit(cache=True)
+def _eyebrow_position(landmarks):
+    """Mean vertical offset of the eyebrows relative to the eyes."""
+    return 0.5 * ((landmarks[282, 1] - landmarks[257, 1]) +  # right eyebrow
+                  (landmarks[52, 1] - landmarks[27, 1]))     # left eyebrow
+
+@numba.njit(cache=True, fastmath=True)
+def expression_deltas(current_landmarks, previous_landmarks):
+    """Calculate absolute changes in eye, mouth and eyebrow metrics.
+    
+    Args:
+        current_landmarks: Nx2 or Nx3 array of current landmark points
+        previous_landmarks: Array of previous landmark points, same shape
+        
+    Returns:
+        Tuple of (eye_aspect_ratio, mouth_aspect_ratio, eyebrow_position) changes
+    """
+    ear_delta = abs(_eye_aspect_ratio(current_landmarks) -
+                    _eye_aspect_ratio(previous_landmarks))
+    mar_delta = abs(_mouth_aspect_ratio(current_landmarks) -
+                    _mouth_aspect_ratio(previous_landmarks))
+    brow_delta = abs(_eyebrow_position(current_landmarks) -
+                     _eyebrow_position(previous_landmarks))
+    return ear_delta, mar_delta, brow_delta
+
+@numba.njit(cache=True, fastmath=True)
+def movement_means(current_landmarks, previous_landmarks, idx_flat, offsets, out):
+    """Calculate mean landmark displacement overall and per feature group.
+    
+    Args:
+        current_landmarks: NxD array of current landmark points
+        previous_landmarks: NxD array of previous landmark points
+        idx_flat: Concatenated landmark indices of all feature groups
+        offsets: Array of K+1 offsets delimiting each group in idx_flat
+        out: Length-K array receiving the mean displacement of each group
+        
+    Returns:
+        Mean displacement over all landmarks
+    """
+    n = current_landmarks.shape[0]
+    distances = np.empty(n)
+    total = 0.0
+    for i in range(n):
+        distances[i] = _distance_between(current_landmarks, previous_landmarks, i)
+        total += distances[i]
+    
+    for k in range(len(offsets) - 1):
+        start = offsets[k]
+        end = offsets[k + 1]
+        group_total = 0.0
+        for j in range(start, end):
+            group_total += distances[idx_flat[j]]
+        out[k] = group_total / (end - start) if end > start else np.nan
+    
+    return total / n
@@ -1,7 +1,9 @@
 import numpy as np
-from datetime import datetime
+import time
 import cv2
 
+from ._expression_metrics_numba import expression_deltas
+
 class ChangeDetector:
     """Detects significant changes in facial features and expressions."""
     
@@ -19,66 +21,41 @@ class ChangeDetector:
             return float('inf')
         
         # Calculate normalized distance between corresponding landmarks
-        distances = np.linalg.norm(current_landmarks - previous_landmarks, axis=1)
+        diff = current_landmarks - previous_landmarks
+        distances = np.sqrt(np.einsum('ij,ij->i', diff, diff))
         # Normalize by the face size (using bounding box diagonal)
-        face_size = np.linalg.norm([
-            np.max(current_landmarks[:, 0]) - np.min(current_landmarks[:, 0]),
-            np.max(current_landmarks[:, 1]) - np.min(current_landmarks[:, 1])
-        ])
-        return np.mean(distances) / face_size if face_size > 0 else 0
+        x = current_landmarks[:, 0]
+        y = current_landmarks[:, 1]
+        dx = x.max() - x.min()
+        dy = y.max() - y.min()
+        face_size = (dx * dx + dy * dy) ** 0.5
+        return float(distances.mean() / face_size) if face_size > 0 else 0.0
 
     def calculate_expression_change(self, current_landmarks, previous_landmarks):
         """Calculate changes in facial expressions using key landmarks."""
         if previous_landmarks is None:
             return float('inf')
 
-        # Eye aspect ratio (vertical/horizontal)
-        def eye_aspect_ratio(eye_points):
-            vertical = np.mean([
-                np.linalg.norm(eye_points[1] - eye_points[5]),
-                np.linalg.norm(eye_points[2] - eye_points[4])
-            ])
-            horizontal = np.linalg.norm(eye_points[0] - eye_points[3])
-            return vertical / (2.0 * horizontal) if horizontal > 0 else 0
-
-        # Calculate EAR for current and previous
-        left_eye_curr = eye_aspect_ratio(current_landmarks[[33, 160, 158, 133, 153, 144]])
-        left_eye_prev = eye_aspect_ratio(previous_landmarks[[33, 160, 158, 133, 153, 144]])
-        
-        # Mouth aspect ratio
-        def mouth_aspect_ratio(landmarks):
-            vertical = np.linalg.norm(landmarks[13] - landmarks[14])
-            horizontal = np.linalg.norm(landmarks[78] - landmarks[308])
-            return vertical / horizontal if horizontal > 0 else 0
-
-        mouth_curr = mouth_aspect_ratio(current_landmarks)
-        mouth_prev = mouth_aspect_ratio(previous_landmarks)
-
-        # Eyebrow position relative to eye
-        def eyebrow_position(landmarks):
-            return np.mean([
-                landmarks[282][1] - landmarks[257][1],  # right eyebrow
-                landmarks[52][1] - landmarks[27][1]     # left eyebrow
-            ])
-
-        eyebrow_curr = eyebrow_position(current_landmarks)
-        eyebrow_prev = eyebrow_position(previous_landmarks)
+        ear_delta, mar_delta, brow_delta = expression_deltas(
+            np.ascontiguousarray(current_landmarks),
+            np.ascontiguousarray(previous_landmarks)
+        )
 
         changes = {
-            "eye_aspect_ratio": abs(left_eye_curr - left_eye_prev),
-            "mouth_aspect_ratio": abs(mouth_curr - mouth_prev),
-            "eyebrow_position": abs(eyebrow_curr - eyebrow_prev) / 100  # Normalize
+            "eye_aspect_ratio": ear_delta,
+            "mouth_aspect_ratio": mar_delta,
+            "eyebrow_position": brow_delta / 100  # Normalize
         }
         
         return changes
 
     def should_save_frame(self, landmarks_array, head_pose):
         """Determine if the current frame should be saved based on changes."""
-        current_time = datetime.now()
+        current_time = time.monotonic()
         
         # Check time interval
         if self.last_save_time is not None:
-            time_diff = (current_time - self.last_save_time).total_seconds()
+            time_diff = current_time - self.last_save_time
             if time_diff < self.thresholds["MIN_FRAME_INTERVAL"]:
                 return False
 
@@ -1,28 +1,28 @@
 import cv2
 import numpy as np
 
+from .face_mask import FaceMaskCache
+
 class FaceColorAnalyzer:
+    def __init__(self):
+        self._mask_cache = FaceMaskCache()
+
     def calculate_average_color(self, frame, landmarks_array):
         """Calculate average color in the face region."""
-        x_coords = landmarks_array[:, 0]
-        y_coords = landmarks_array[:, 1]
-
-        # Get bounding box
-        x_min, x_max = int(np.min(x_coords)), int(np.max(x_coords))
-        y_min, y_max = int(np.min(y_coords)), int(np.max(y_coords))
-
-        # Clip to image boundaries
+        # Work on the landmarks' bounding box, a view of a small part of the frame
         h, w = frame.shape[:2]
-        x_min = max(0, x_min)
-        x_max = min(w - 1, x_max)
-        y_min = max(0, y_min)
-        y_max = min(h - 1, y_max)
+        points = landmarks_array[:, :2]
+        x0, y0 = np.clip(np.floor(points.min(axis=0)).astype(int), 0, [w, h])
+        x1, y1 = np.clip(np.ceil(points.max(axis=0)).astype(int) + 1, 0, [w, h])
+        roi = frame[y0:y1, x0:x1]
+        if roi.size == 0:
+            return (0.0, 0.0, 0.0)
 
-        # Extract face region
-        face_roi = frame[y_min:y_max, x_min:x_max]
-        if face_roi.size == 0:
-            return (0, 0, 0)
+        # Restrict the mean to the convex hull of the landmarks so background
+        # pixels in the bounding box corners are excluded; an empty mask
+        # yields (0, 0, 0)
+        mask = self._mask_cache.get_mask(points - (x0, y0), roi.shape[:2])
 
         # Calculate mean color (BGR)
-        mean_color = cv2.mean(face_roi)[:3]
+        mean_color = cv2.mean(roi, mask=mask)[:3]
         return mean_color
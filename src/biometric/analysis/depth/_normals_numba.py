@@ -0,0 +1,30 @@
+"""Numba-compiled kernel for surface normals of a depth grid."""
+import numba
+
+@numba.njit(cache=True, parallel=True)
+def surface_normals(depth, dx, dy, out):
+    """Compute unit surface normals of a depth grid in a single pass.
+    
+    Gradients match np.gradient: central differences in the interior and
+    one-sided differences on the borders. fastmath is left off because depth
+    maps carry NaN outside the face.
+    
+    Args:
+        depth: HxW array of depth values
+        dx: Grid spacing along columns
+        dy: Grid spacing along rows
+        out: HxWx3 array receiving the (nx, ny, nz) normals
+    """
+    height, width = depth.shape
+    for i in numba.prange(height):
+        i0 = max(i - 1, 0)
+        i1 = min(i + 1, height - 1)
+        for j in range(width):
+            j0 = max(j - 1, 0)
+            j1 = min(j + 1, width - 1)
+            gy = (depth[i1, j] - depth[i0, j]) / ((i1 - i0) * dy) if i1 > i0 else 0.0
+            gx = (depth[i, j1] - depth[i, j0]) / ((j1 - j0) * dx) if j1 > j0 else 0.0
+            magnitude = (gx * gx + gy * gy + 1.0) ** 0.5
+            out[i, j, 0] = -gx / magnitude
+            out[i, j, 1] = -gy / magnitude
+            out[i, j, 2] = 1.0 / magnitude
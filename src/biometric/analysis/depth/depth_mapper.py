@@ -1,11 +1,20 @@
 """Core functionality for creating and managing depth maps from facial landmarks."""
 import numpy as np
 import cv2
-from scipy.interpolate import griddata
+from scipy.spatial import Delaunay
+from scipy.ndimage import distance_transform_edt
+
+from ..face_mask import FaceMaskCache
 
 class DepthMapper:
     """Creates and manages depth maps from facial landmarks."""
     
+    # Mean landmark displacement (in depth map pixels) before re-triangulating
+    RETRIANGULATE_THRESHOLD = 1.0
+    
+    # Grid pixels interpolated per tile, sized so the gather scratch stays in L2
+    INTERP_TILE_PIXELS = 128 * 128
+    
     def __init__(self, image_size, feature_indices):
         """Initialize the depth mapper.
         
@@ -16,6 +25,54 @@ class DepthMapper:
         self.image_width, self.image_height = image_size
         self.feature_indices = feature_indices
         self.depth_map = None
+        self._tri = None
+        self._last_shape = None
+        self._interp_indices = None
+        self._interp_weights = None
+        self._mask_cache = FaceMaskCache()
+        self._gather_buf = None
+    
+    def _get_interpolation_weights(self, points, resolution):
+        """Return per-pixel landmark indices and barycentric weights for the grid.
+        
+        MediaPipe landmark indices are stable across frames, so the QHull
+        triangulation and the barycentric weights of every grid pixel only need
+        to be rebuilt when the resolution changes or the landmarks drift
+        noticeably from the cached layout. The interpolation grid itself is
+        only built when the weights are rebuilt.
+        
+        Returns:
+            Tuple of (indices, weights), both shaped (3, *grid_shape). Pixels
+            outside the triangulation have NaN weights.
+        """
+        if (self._tri is None or self._last_shape != resolution or
+                len(self._tri.points) != len(points) or
+                np.mean(np.abs(self._tri.points - points)) > self.RETRIANGULATE_THRESHOLD):
+            # Create grid for interpolation
+            grid_x, grid_y = np.mgrid[0:resolution[0]:resolution[0]*1j,
+                                     0:resolution[1]:resolution[1]*1j]
+            
+            tri = Delaunay(points)
+            pixels = np.column_stack([grid_x.ravel(), grid_y.ravel()])
+            simplex = tri.find_simplex(pixels)
+            outside = simplex < 0
+            
+            # Barycentric coordinates from the affine transform of each simplex
+            transform = tri.transform[simplex]
+            bary = np.einsum('pij,pj->pi', transform[:, :2], pixels - transform[:, 2])
+            weights = np.column_stack([bary, 1.0 - bary.sum(axis=1)])
+            indices = tri.simplices[simplex]
+            weights[outside] = np.nan
+            indices[outside] = 0
+            
+            self._tri = tri
+            self._last_shape = resolution
+            self._interp_indices = indices.T.reshape((3,) + grid_x.shape).astype(np.int32)
+            self._interp_weights = weights.T.reshape((3,) + grid_x.shape).astype(np.float32)
+            
+            # The face has moved or turned enough to change the hull vertices too
+            self._mask_cache.reset()
+        return self._interp_indices, self._interp_weights
     
     def _create_face_mask(self, points, resolution):
         """Create a mask for the face region using facial landmarks."""
@@ -24,84 +81,162 @@ class DepthMapper:
         forehead_points = points[[10, 108, 67, 69, 104, 151, 337, 299, 333, 297, 338]]
         mask_points = np.vstack([contour_points, forehead_points])
         
-        # Create convex hull
-        hull = cv2.convexHull(mask_points.astype(np.float32))
-        
-        # Create empty mask
-        mask = np.zeros(resolution, dtype=np.uint8)
-        
         # Fill the hull area
-        hull_points = hull.reshape(-1, 2)
-        hull_points = hull_points * np.array([resolution[0]/self.image_width, 
-                                            resolution[1]/self.image_height])
-        cv2.fillConvexPoly(mask, hull_points.astype(np.int32), 1)
+        mask = self._mask_cache.get_mask(
+            mask_points[:, :2], resolution,
+            scale=(resolution[0]/self.image_width, resolution[1]/self.image_height)
+        )
         
-        return mask.astype(bool)
+        return mask > 0
 
-    def create_depth_map(self, landmarks_array, resolution=None):
-        """Create a depth map from landmark points using interpolation.
+    def _normalize_landmarks(self, landmarks_stack, resolution):
+        """Scale a landmark stack to grid coordinates and normalized depths.
         
         Args:
-            landmarks_array: Nx3 array of landmark points (x, y, z)
-            resolution: Optional tuple of (width, height) for the depth map resolution.
-                       If None, uses the image dimensions
+            landmarks_stack: FxNx3 array of landmark points (x, y, z)
+            resolution: Tuple of (width, height) of the depth map grid
         
         Returns:
-            Interpolated depth map as a 2D numpy array
+            Tuple of (points, normalized_depths) shaped FxNx2 and FxN
         """
-        # Use lower resolution for processing if not specified
-        if resolution is None:
-            resolution = (self.image_width // 4, self.image_height // 4)
-
+        # Landmarks carry far less precision than float32 offers
+        landmarks_stack = landmarks_stack.astype(np.float32, copy=False)
+        
         # Calculate relative depths from nose tip
         nose_tip_idx = self.feature_indices['nose_tip']
-        nose_tip_depth = landmarks_array[nose_tip_idx, 2]
-        relative_depths = landmarks_array[:, 2] - nose_tip_depth
+        nose_tip_depth = landmarks_stack[:, nose_tip_idx, 2]
+        relative_depths = landmarks_stack[:, :, 2] - nose_tip_depth[:, np.newaxis]
         
         # Calculate face size for normalization
-        face_points = landmarks_array[self.feature_indices['face_contour']]
-        face_width = np.max(face_points[:, 0]) - np.min(face_points[:, 0])
-        face_height = np.max(face_points[:, 1]) - np.min(face_points[:, 1])
+        face_points = landmarks_stack[:, self.feature_indices['face_contour']]
+        face_width = np.ptp(face_points[:, :, 0], axis=1)
+        face_height = np.ptp(face_points[:, :, 1], axis=1)
         face_size = np.sqrt(face_width * face_height)
         
         # Normalize depths
         scale_factor = 0.1 * (resolution[0] / self.image_width)
-        normalized_depths = relative_depths / (face_size * scale_factor)
-        
-        # Create grid for interpolation
-        grid_x, grid_y = np.mgrid[0:resolution[0]:resolution[0]*1j,
-                                 0:resolution[1]:resolution[1]*1j]
+        normalized_depths = relative_depths / (face_size * scale_factor)[:, np.newaxis]
         
         # Scale landmark points to match the grid resolution
-        points = landmarks_array[:, :2].copy()
-        points[:, 0] *= (resolution[0] / self.image_width)
-        points[:, 1] *= (resolution[1] / self.image_height)
-        
-        # Create face mask
-        face_mask = self._create_face_mask(points, resolution)
-        
-        # Interpolate depths using linear method for speed
-        depth_map = griddata(points, normalized_depths, (grid_x, grid_y), 
-                           method='linear', fill_value=np.nan)
-        
-        # Fill remaining NaN values within face mask using nearest neighbor
-        if np.any(np.isnan(depth_map) & face_mask):
-            nn_interpolated = griddata(points, normalized_depths, (grid_x, grid_y), 
-                                     method='nearest', fill_value=np.nan)
-            depth_map = np.where(np.isnan(depth_map) & face_mask, 
-                               nn_interpolated, depth_map)
-        
-        # Apply light smoothing to reduce noise
-        valid_mask = ~np.isnan(depth_map)
-        if np.any(valid_mask):
-            valid_depths = depth_map[valid_mask]
-            smoothed = cv2.GaussianBlur(valid_depths.reshape(-1, 1), (1, 3), 0).ravel()
-            result = np.full_like(depth_map, np.nan)
-            result[valid_mask] = smoothed
-            depth_map = result
-        
-        self.depth_map = depth_map
+        grid_scale = np.array([resolution[0] / self.image_width,
+                               resolution[1] / self.image_height], dtype=np.float32)
+        points = landmarks_stack[:, :, :2] * grid_scale
+        
+        return points, normalized_depths
+    
+    def _interpolate_depths(self, normalized_depths, indices, weights):
+        """Interpolate FxN depths over the grid as a tiled weighted gather.
+        
+        Pixels are processed in tiles so the (frames, 3, pixels) scratch
+        buffer stays cache resident, and each tile's weighted sum is written
+        straight into the output.
+        """
+        num_frames = len(normalized_depths)
+        flat_indices = indices.reshape(3, -1)
+        flat_weights = weights.reshape(3, -1)
+        num_pixels = flat_indices.shape[1]
+        tile = min(max(1, self.INTERP_TILE_PIXELS // num_frames), num_pixels)
+        
+        shape = (num_frames, 3, tile)
+        gathered = self._gather_buf
+        if (gathered is None or gathered.shape != shape or
+                gathered.dtype != normalized_depths.dtype):
+            gathered = self._gather_buf = np.empty(shape, dtype=normalized_depths.dtype)
+        
+        depth_maps = np.empty((num_frames, num_pixels), dtype=normalized_depths.dtype)
+        for start in range(0, num_pixels, tile):
+            stop = min(start + tile, num_pixels)
+            part = gathered[:, :, :stop - start]
+            np.take(normalized_depths, flat_indices[:, start:stop], axis=1, out=part, mode='clip')
+            np.multiply(part, flat_weights[:, start:stop], out=part)
+            part.sum(axis=1, out=depth_maps[:, start:stop])
+        
+        return depth_maps.reshape((num_frames,) + indices.shape[1:])
+    
+    @staticmethod
+    def _fill_and_smooth(depth_map, face_mask):
+        """Fill holes inside the face mask and lightly smooth a depth map."""
+        # Fill remaining NaN values within face mask from the nearest valid pixel
+        missing = np.isnan(depth_map)
+        holes = missing & face_mask
+        if np.any(holes) and not np.all(missing):
+            nearest = distance_transform_edt(missing, return_distances=False,
+                                             return_indices=True)
+            depth_map[holes] = depth_map[tuple(nearest[:, holes])]
+        
+        # Apply light spatial smoothing to reduce noise, using normalized
+        # convolution so NaN pixels neither contribute nor get filled
+        nan_mask = np.isnan(depth_map)
+        if not np.all(nan_mask):
+            valid_weight = (~nan_mask).astype(np.float32)
+            numerator = cv2.GaussianBlur(np.where(nan_mask, 0.0, depth_map).astype(np.float32),
+                                         (3, 3), 0)
+            denominator = cv2.GaussianBlur(valid_weight, (3, 3), 0)
+            depth_map = np.where(nan_mask, np.nan,
+                                 numerator / np.maximum(denominator, 1e-6)).astype(np.float32)
+        
         return depth_map
+    
+    def create_depth_map(self, landmarks_array, resolution=None):
+        """Create a depth map from landmark points using interpolation.
+        
+        Args:
+            landmarks_array: Nx3 array of landmark points (x, y, z)
+            resolution: Optional tuple of (width, height) for the depth map resolution.
+                       If None, uses the image dimensions
+        
+        Returns:
+            Interpolated depth map as a 2D numpy array
+        """
+        return self.create_depth_map_batch(landmarks_array[np.newaxis], resolution)[0]
+    
+    def create_depth_map_batch(self, landmarks_stack, resolution=None):
+        """Create depth maps for a stack of frames at once.
+        
+        Normalization runs over the whole stack, and consecutive frames that
+        share the cached triangulation are interpolated in a single gather.
+        
+        Args:
+            landmarks_stack: FxNx3 array of landmark points (x, y, z)
+            resolution: Optional tuple of (width, height) for the depth map resolution.
+                       If None, uses the image dimensions
+        
+        Returns:
+            Fx(width)x(height) array of interpolated depth maps
+        """
+        # Use lower resolution for processing if not specified
+        if resolution is None:
+            resolution = (self.image_width // 4, self.image_height // 4)
+        
+        num_frames = len(landmarks_stack)
+        if num_frames == 0:
+            return np.empty((0,) + tuple(resolution), dtype=np.float32)
+        
+        points, normalized_depths = self._normalize_landmarks(landmarks_stack, resolution)
+        
+        depth_maps = None
+        start = 0
+        while start < num_frames:
+            indices, weights = self._get_interpolation_weights(points[start], resolution)
+            
+            # Extend the run while later frames keep the same triangulation
+            end = start + 1
+            while (end < num_frames and
+                   self._get_interpolation_weights(points[end], resolution)[0] is indices):
+                end += 1
+            
+            interpolated = self._interpolate_depths(normalized_depths[start:end],
+                                                    indices, weights)
+            if depth_maps is None:
+                depth_maps = np.empty((num_frames,) + interpolated.shape[1:], dtype=np.float32)
+            
+            for offset, depth_map in enumerate(interpolated):
+                face_mask = self._create_face_mask(points[start + offset], resolution)
+                depth_maps[start + offset] = self._fill_and_smooth(depth_map, face_mask)
+            start = end
+        
+        self.depth_map = depth_maps[-1]
+        return depth_maps
 
     def get_surface_gradients(self):
         """Calculate surface gradients from the depth map.
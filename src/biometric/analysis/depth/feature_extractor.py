@@ -11,6 +11,12 @@ class DepthFeatureExtractor:
             feature_indices: Dictionary of facial feature indices
         """
         self.feature_indices = feature_indices
+        
+        # Index arrays converted once, instead of from lists on every frame
+        self._feature_index_arrays = {
+            name: np.asarray(indices, dtype=np.intp) if isinstance(indices, list) else int(indices)
+            for name, indices in feature_indices.items()
+        }
     
     def extract_feature_depths(self, landmarks_array):
         """Extract depth values for key facial features.
@@ -22,20 +28,21 @@ class DepthFeatureExtractor:
             Dictionary of feature names and their depth characteristics
         """
         feature_depths = {}
+        z = np.ascontiguousarray(landmarks_array[:, 2])
         
-        for feature_name, indices in self.feature_indices.items():
-            if isinstance(indices, list):
+        for feature_name, indices in self._feature_index_arrays.items():
+            if isinstance(indices, np.ndarray):
                 # Calculate statistics for features with multiple points
-                depths = landmarks_array[indices, 2]
+                depths = z[indices]
                 feature_depths[feature_name] = {
                     'mean_depth': float(np.mean(depths)),
                     'std_depth': float(np.std(depths)),
-                    'relative_depths': depths.tolist()
+                    'relative_depths': depths
                 }
             else:
                 # Single point feature
                 feature_depths[feature_name] = {
-                    'depth': float(landmarks_array[indices, 2])
+                    'depth': float(z[indices])
                 }
         
         return feature_depths
@@ -49,6 +56,7 @@ class DepthFeatureExtractor:
         Returns:
             Dictionary of depth-based features
         """
+        landmarks_array = landmarks_array.astype(np.float32, copy=False)
         feature_depths = self.extract_feature_depths(landmarks_array)
         
         # Calculate distinctive depth relationships
@@ -84,19 +92,16 @@ class DepthFeatureExtractor:
         Returns:
             Dictionary of depth profile metrics
         """
-        # Get vertical depth profile
-        vertical_profile = np.sort(landmarks_array[:, 2])
+        # Get all depth percentiles in a single pass
         percentiles = [10, 25, 50, 75, 90]
+        values = np.percentile(landmarks_array[:, 2], percentiles)
+        p25, p75 = values[1], values[3]
         
         return {
             'depth_percentiles': {
-                f'p{p}': float(np.percentile(vertical_profile, p))
-                for p in percentiles
+                f'p{p}': float(v) for p, v in zip(percentiles, values)
             },
-            'depth_quartile_ratio': float(
-                np.percentile(vertical_profile, 75) /
-                np.percentile(vertical_profile, 25)
-            )
+            'depth_quartile_ratio': float(p75 / p25) if p25 else float('inf')
         }
     
     def analyze_feature_symmetry(self, landmarks_array):
@@ -116,14 +121,24 @@ class DepthFeatureExtractor:
             ('left_eyebrow', 'right_eyebrow')
         ]
         
+        z = np.ascontiguousarray(landmarks_array[:, 2])
         for left_feature, right_feature in feature_pairs:
-            left_depths = landmarks_array[self.feature_indices[left_feature], 2]
-            right_depths = landmarks_array[self.feature_indices[right_feature], 2]
+            left_depths = z[self._feature_index_arrays[left_feature]]
+            right_depths = z[self._feature_index_arrays[right_feature]]
+            
+            # Closed-form Pearson correlation and variance ratio of the centered depths
+            left_mean = left_depths.mean()
+            right_mean = right_depths.mean()
+            a = left_depths - left_mean
+            b = right_depths - right_mean
+            aa = a @ a
+            bb = b @ b
+            denom = np.sqrt(aa * bb)
             
             symmetry_metrics[f'{left_feature}_{right_feature}'] = {
-                'depth_difference': float(np.mean(left_depths) - np.mean(right_depths)),
-                'pattern_correlation': float(np.corrcoef(left_depths, right_depths)[0, 1]),
-                'variance_ratio': float(np.var(left_depths) / np.var(right_depths))
+                'depth_difference': float(left_mean - right_mean),
+                'pattern_correlation': float(a @ b / denom) if denom > 0 else 0.0,
+                'variance_ratio': float((aa / len(a)) / (bb / len(b))) if bb > 0 else float('inf')
             }
         
         return symmetry_metrics
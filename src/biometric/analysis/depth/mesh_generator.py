@@ -1,6 +1,86 @@
 """Generate and analyze 3D mesh representations of facial features."""
 import numpy as np
+import mediapipe as mp
 from scipy.spatial import Delaunay
+from scipy.ndimage import map_coordinates
+
+from ._normals_numba import surface_normals
+
+def _triangulate_edges(edges):
+    """Rebuild the consistently wound triangles of a tessellation edge list.
+    
+    Every 3-clique of the edge graph is a candidate face. A clique whose
+    edges are all shared by more than two candidates is a separating
+    triangle (e.g. around a degree-3 vertex) rather than a face, and is
+    dropped. Faces are then oriented by walking across shared edges, which
+    two neighbouring faces traverse in opposite directions. Each walk starts
+    from a boundary face, whose winding is taken from the direction of its
+    boundary edge in `edges`.
+    
+    Args:
+        edges: Iterable of (i, j) vertex index pairs, directed along the
+            winding of the face they came from
+        
+    Returns:
+        Mx3 int32 array of triangle vertex indices
+    """
+    directed = set(edges)
+    neighbors = {}
+    for i, j in directed:
+        neighbors.setdefault(i, set()).add(j)
+        neighbors.setdefault(j, set()).add(i)
+    
+    candidates = set()
+    for i, j in directed:
+        for k in neighbors[i] & neighbors[j]:
+            candidates.add(tuple(sorted((i, j, k))))
+    
+    def face_edges(face):
+        a, b, c = face
+        return ((a, b), (b, c), (a, c))
+    
+    edge_counts = {}
+    for face in candidates:
+        for edge in face_edges(face):
+            edge_counts[edge] = edge_counts.get(edge, 0) + 1
+    faces = sorted(face for face in candidates
+                   if any(edge_counts[edge] <= 2 for edge in face_edges(face)))
+    
+    edge_faces = {}
+    for face in faces:
+        for edge in face_edges(face):
+            edge_faces.setdefault(edge, []).append(face)
+    
+    # Seed from boundary faces first so each walk inherits the source winding
+    def boundary_edge(face):
+        return next((edge for edge in face_edges(face) if len(edge_faces[edge]) == 1), None)
+    
+    oriented = {}
+    for seed in sorted(faces, key=lambda face: boundary_edge(face) is None):
+        if seed in oriented:
+            continue
+        edge = boundary_edge(seed)
+        if edge is None:
+            oriented[seed] = seed
+        else:
+            a, b = edge if edge in directed else edge[::-1]
+            oriented[seed] = (a, b, sum(seed) - edge[0] - edge[1])
+        
+        stack = [seed]
+        while stack:
+            a, b, c = oriented[stack.pop()]
+            for u, v in ((a, b), (b, c), (c, a)):
+                for face in edge_faces[(min(u, v), max(u, v))]:
+                    if face not in oriented:
+                        oriented[face] = (v, u, sum(face) - u - v)
+                        stack.append(face)
+    
+    return np.array(sorted(oriented.values()), dtype=np.int32)
+
+# Fixed triangle list of MediaPipe's 468-point face mesh: 852 faces, one per
+# three directed tessellation edges
+FACE_MESH_SIZE = 468
+FACE_SIMPLICES = _triangulate_edges(mp.solutions.face_mesh.FACEMESH_TESSELATION)
 
 class MeshGenerator:
     """Generates and manages 3D mesh representations of facial features."""
@@ -9,9 +89,32 @@ class MeshGenerator:
         """Initialize the mesh generator."""
         self.mesh = None
         self.vector_field = None
+        self._cached_simplices = None
+        self._buffers = {}
+        self._sample_coords = None
+        self._sample_coords_key = None
+    
+    def _get_buffer(self, name, shape, dtype):
+        """Get a reusable scratch array, reallocating only when shape or dtype change."""
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = self._buffers[name] = np.empty(shape, dtype=dtype)
+        return buf
+    
+    def invalidate_topology(self):
+        """Discard the cached triangulation so the next mesh re-triangulates.
+        
+        Only needed if the landmark ordering changes, e.g. when switching
+        landmark models.
+        """
+        self._cached_simplices = None
     
     def create_3d_mesh(self, landmarks_array):
-        """Create a 3D mesh from landmark points using Delaunay triangulation.
+        """Create a 3D mesh from landmark points.
+        
+        MediaPipe face meshes use the canonical tessellation table directly.
+        Other landmark sets fall back to a Delaunay triangulation, computed
+        once and reused until `invalidate_topology` is called.
         
         Args:
             landmarks_array: Nx3 array of landmark points
@@ -19,15 +122,25 @@ class MeshGenerator:
         Returns:
             Dictionary containing vertices and faces
         """
-        # Project points to 2D for triangulation
-        points_2d = landmarks_array[:, :2]
+        landmarks_array = landmarks_array.astype(np.float32, copy=False)
+        
+        if len(landmarks_array) >= FACE_MESH_SIZE:
+            self.mesh = {
+                'vertices': landmarks_array,
+                'faces': FACE_SIMPLICES
+            }
+            return self.mesh
         
-        # Perform Delaunay triangulation
-        tri = Delaunay(points_2d)
+        if self._cached_simplices is None:
+            # Project points to 2D for triangulation
+            points_2d = landmarks_array[:, :2]
+            
+            # Perform Delaunay triangulation
+            self._cached_simplices = Delaunay(points_2d).simplices
         
         self.mesh = {
             'vertices': landmarks_array,
-            'faces': tri.simplices
+            'faces': self._cached_simplices
         }
         
         return self.mesh
@@ -35,6 +148,9 @@ class MeshGenerator:
     def create_vector_field(self, depth_map, grid_size=20):
         """Create a 3D vector field representing facial surface normals.
         
+        Normals are computed from the depth map sampled at the grid positions,
+        so `vectors[i, j]` is the normal at `positions[i, j]`.
+        
         Args:
             depth_map: 2D array of depth values
             grid_size: Size of the grid for vector field
@@ -42,24 +158,32 @@ class MeshGenerator:
         Returns:
             Dictionary containing vector components and positions
         """
-        # Create a grid of points
+        # Create a sparse grid of points
         height, width = depth_map.shape
-        x = np.linspace(0, width, grid_size)
-        y = np.linspace(0, height, grid_size)
-        X, Y = np.meshgrid(x, y)
+        x = np.linspace(0, width, grid_size, dtype=np.float32)
+        y = np.linspace(0, height, grid_size, dtype=np.float32)
+        X, Y = np.meshgrid(x, y, sparse=True)
+        
+        # Sample the depth map on the grid so normals line up with positions
+        key = (depth_map.shape, grid_size)
+        if self._sample_coords_key != key:
+            self._sample_coords = np.array(np.broadcast_arrays(Y, X))
+            self._sample_coords_key = key
+        sampled = map_coordinates(depth_map.astype(np.float32, copy=False),
+                                  self._sample_coords, order=1, mode='nearest')
         
-        # Compute gradients
-        gy, gx = np.gradient(depth_map)
+        # Compute gradients in depth map pixel units and normalize in one pass
+        vectors = np.empty((grid_size, grid_size, 3), dtype=np.float32)
+        surface_normals(sampled, width / max(grid_size - 1, 1),
+                        height / max(grid_size - 1, 1), vectors)
         
-        # Normalize vectors
-        magnitude = np.sqrt(gx**2 + gy**2 + 1)
-        nx = -gx / magnitude
-        ny = -gy / magnitude
-        nz = 1 / magnitude
+        positions = np.empty((grid_size, grid_size, 2), dtype=np.float32)
+        positions[..., 0] = X
+        positions[..., 1] = Y
         
         self.vector_field = {
-            'positions': np.stack([X, Y], axis=-1),
-            'vectors': np.stack([nx, ny, nz], axis=-1)
+            'positions': positions,
+            'vectors': vectors
         }
         
         return self.vector_field
@@ -98,20 +222,27 @@ class MeshGenerator:
             Dictionary of face metrics
         """
         # Get face vertices
-        face_vertices = vertices[faces]
+        face_vertices = np.take(vertices, faces, axis=0, mode='clip',
+                                out=self._get_buffer('face_vertices', faces.shape + vertices.shape[1:],
+                                                     vertices.dtype))
         
         # Calculate face normals and areas
-        v1 = face_vertices[:, 1] - face_vertices[:, 0]
-        v2 = face_vertices[:, 2] - face_vertices[:, 0]
-        face_normals = np.cross(v1, v2)
-        face_areas = np.linalg.norm(face_normals, axis=1) / 2
-        face_normals = face_normals / np.linalg.norm(face_normals, axis=1, keepdims=True)
+        edge_shape = (len(faces), vertices.shape[1])
+        v1 = np.subtract(face_vertices[:, 1], face_vertices[:, 0],
+                         out=self._get_buffer('v1', edge_shape, vertices.dtype))
+        v2 = np.subtract(face_vertices[:, 2], face_vertices[:, 0],
+                         out=self._get_buffer('v2', edge_shape, vertices.dtype))
+        cross = np.cross(v1, v2)
+        cross_norm = np.sqrt(np.einsum('ij,ij->i', cross, cross))
+        face_areas = cross_norm * 0.5
+        face_normals = cross / cross_norm[:, None]
         
+        # Arrays are converted to lists at the serialization boundary
         return {
-            'areas': face_areas.tolist(),
-            'normals': face_normals.tolist(),
-            'mean_area': float(np.mean(face_areas)),
-            'total_area': float(np.sum(face_areas))
+            'areas': face_areas,
+            'normals': face_normals,
+            'mean_area': float(face_areas.mean()),
+            'total_area': float(face_areas.sum())
         }
     
     def _calculate_vertex_metrics(self, vertices, faces):
@@ -125,11 +256,10 @@ class MeshGenerator:
             Dictionary of vertex metrics
         """
         # Calculate vertex degree (number of connected faces)
-        vertex_degrees = np.zeros(len(vertices))
-        np.add.at(vertex_degrees, faces.ravel(), 1)
+        vertex_degrees = np.bincount(faces.ravel(), minlength=len(vertices)).astype(np.float32)
         
         return {
-            'degrees': vertex_degrees.tolist(),
+            'degrees': vertex_degrees,
             'mean_degree': float(np.mean(vertex_degrees)),
             'max_degree': float(np.max(vertex_degrees))
         }
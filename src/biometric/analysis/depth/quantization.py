@@ -0,0 +1,48 @@
+"""Compact 8-bit storage for depth maps."""
+import numpy as np
+from dataclasses import dataclass
+
+@dataclass
+class QuantizedDepthMap:
+    """Depth map stored as uint8 levels between its minimum and maximum depth.
+    
+    Levels 0-254 cover the depth range in equal steps; NaN pixels (outside
+    the face) are stored as 255.
+    """
+    data: np.ndarray
+    z_min: float
+    z_max: float
+    
+    LEVELS = 255
+    NAN_LEVEL = 255
+    
+    @classmethod
+    def from_depth_map(cls, depth_map: np.ndarray) -> 'QuantizedDepthMap':
+        """Quantize a float depth map.
+        
+        Args:
+            depth_map: 2D depth map, NaN outside the face
+        
+        Returns:
+            QuantizedDepthMap object
+        """
+        valid = ~np.isnan(depth_map)
+        if not np.any(valid):
+            return cls(np.full(depth_map.shape, cls.NAN_LEVEL, dtype=np.uint8), 0.0, 0.0)
+        
+        z_min = float(np.min(depth_map[valid]))
+        z_max = float(np.max(depth_map[valid]))
+        
+        # Interior bin edges, so valid depths land in levels 0..LEVELS-1
+        edges = np.linspace(z_min, z_max, cls.LEVELS + 1)[1:-1]
+        data = np.digitize(depth_map, edges).astype(np.uint8)
+        data[~valid] = cls.NAN_LEVEL
+        
+        return cls(data, z_min, z_max)
+    
+    def dequantize(self) -> np.ndarray:
+        """Reconstruct a float32 depth map from bin centers."""
+        step = (self.z_max - self.z_min) / self.LEVELS
+        depth_map = self.z_min + (self.data.astype(np.float32) + 0.5) * step
+        depth_map[self.data == self.NAN_LEVEL] = np.nan
+        return depth_map.astype(np.float32, copy=False)
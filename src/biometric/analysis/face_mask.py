@@ -0,0 +1,59 @@
+"""Convex-hull face masks shared by the analysis components."""
+import numpy as np
+import cv2
+
+class FaceMaskCache:
+    """Rasterizes convex-hull face masks into a reusable buffer.
+    
+    Landmark topology is fixed, so the indices of the hull vertices are
+    computed on the first call and reused until `reset` is called, e.g. after
+    the head pose changes; each frame only gathers and scales those points.
+    The hull of a steady face also rounds to the same integer polygon on
+    consecutive frames, in which case the fill is skipped.
+    """
+    
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._hull_indices = None
+        self._num_points = None
+        self._key = None
+        self._mask = None
+    
+    def reset(self):
+        """Discard the cached hull so the next call recomputes it."""
+        self._hull_indices = None
+        self._num_points = None
+        self._key = None
+    
+    def get_mask(self, points, shape, scale=(1.0, 1.0)):
+        """Get a uint8 mask (0/255) of the convex hull of the given points.
+        
+        Args:
+            points: Nx2 array of (x, y) points
+            shape: Shape of the mask array
+            scale: Optional (x, y) scale applied to the hull vertices
+            
+        Returns:
+            Mask array of the requested shape. The buffer is reused by later
+            calls, so callers must not modify it.
+        """
+        points = np.asarray(points, dtype=np.float32)
+        if self._hull_indices is None or self._num_points != len(points):
+            self._hull_indices = cv2.convexHull(points, returnPoints=False).ravel()
+            self._num_points = len(points)
+        
+        polygon = (points[self._hull_indices] * np.asarray(scale, dtype=np.float32)).astype(np.int32)
+        
+        if self._mask is None or self._mask.shape != tuple(shape):
+            self._mask = np.zeros(shape, dtype=np.uint8)
+            self._key = None
+        
+        key = polygon.tobytes()
+        if key != self._key:
+            # The cached hull vertices may no longer be convex after the face
+            # moves, so use the general polygon fill
+            self._mask.fill(0)
+            cv2.fillPoly(self._mask, [polygon], 255)
+            self._key = key
+        
+        return self._mask
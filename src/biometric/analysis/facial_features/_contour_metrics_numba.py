@@ -0,0 +1,76 @@
+"""Numba-compiled kernel for fused face contour metrics."""
+import math
+
+import numba
+import numpy as np
+
+@numba.njit(cache=True, error_model='numpy')
+def contour_metrics(contour):
+    """Compute contour length, smoothness and symmetry.
+    
+    Length and smoothness come from first and second differences gathered in
+    one sweep that also finds the vertical axis; symmetry then pairs points
+    left and right of the axis in contour order and mirrors them across it.
+    
+    Returns:
+        Tuple of (length, smoothness, symmetry)
+    """
+    n, dims = contour.shape
+    
+    length = 0.0
+    curvature_total = 0.0
+    x_total = 0.0
+    x_min = np.inf
+    x_max = -np.inf
+    for i in range(n):
+        x = contour[i, 0]
+        x_total += x
+        x_min = min(x_min, x)
+        x_max = max(x_max, x)
+    
+        if i >= 1:
+            total = 0.0
+            for k in range(dims):
+                d = contour[i, k] - contour[i - 1, k]
+                total += d * d
+            length += math.sqrt(total)
+    
+        if i >= 2:
+            total = 0.0
+            for k in range(dims):
+                d = contour[i, k] - 2.0 * contour[i - 1, k] + contour[i - 2, k]
+                total += d * d
+            curvature_total += math.sqrt(total)
+    
+    smoothness = 1.0 / (1.0 + curvature_total / (n - 2)) if n > 2 else np.nan
+    
+    # Split points around the vertical axis, keeping contour order
+    center_line = x_total / n
+    left = np.empty(n, dtype=np.int64)
+    right = np.empty(n, dtype=np.int64)
+    num_left = 0
+    num_right = 0
+    for i in range(n):
+        if contour[i, 0] < center_line:
+            left[num_left] = i
+            num_left += 1
+        elif contour[i, 0] > center_line:
+            right[num_right] = i
+            num_right += 1
+    
+    # Average distance between left points and mirrored right points
+    count = min(num_left, num_right)
+    asymmetry_total = 0.0
+    for m in range(count):
+        l, r = left[m], right[m]
+        d = contour[l, 0] + contour[r, 0] - 2.0 * center_line
+        total = d * d
+        for k in range(1, dims):
+            d = contour[l, k] - contour[r, k]
+            total += d * d
+        asymmetry_total += math.sqrt(total)
+    
+    asymmetry = asymmetry_total / count if count > 0 else np.nan
+    symmetry = 1.0 - asymmetry / (x_max - x_min)
+    
+    return length, smoothness, symmetry
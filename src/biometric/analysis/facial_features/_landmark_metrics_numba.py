@@ -0,0 +1,127 @@
+"""Numba-compiled kernels for landmark distances, angles and symmetry."""
+import math
+
+import numba
+import numpy as np
+
+@numba.njit(cache=True)
+def _distance(landmarks, i, j):
+    """Euclidean distance between landmarks i and j."""
+    total = 0.0
+    for k in range(landmarks.shape[1]):
+        d = landmarks[i, k] - landmarks[j, k]
+        total += d * d
+    return math.sqrt(total)
+
+@numba.njit(cache=True)
+def _centroid(landmarks, indices):
+    """Mean position of the indexed landmarks."""
+    center = np.zeros(landmarks.shape[1])
+    for i in indices:
+        for k in range(landmarks.shape[1]):
+            center[k] += landmarks[i, k]
+    return center / len(indices)
+
+@numba.njit(cache=True)
+def _feature_angle(landmarks, indices):
+    """Angle in degrees of a feature relative to horizontal."""
+    first, last = indices[0], indices[-1]
+    return math.degrees(math.atan2(landmarks[last, 1] - landmarks[first, 1],
+                                   landmarks[last, 0] - landmarks[first, 0]))
+
+@numba.njit(cache=True)
+def _line_distances(landmarks, indices, line_point, line_direction):
+    """Perpendicular distances from the indexed landmarks to a line.
+    
+    With a unit direction the distance is the norm of the cross product of
+    the offset and the direction, which reduces to a scalar for 2D points.
+    """
+    distances = np.empty(len(indices))
+    dx, dy = line_direction[0], line_direction[1]
+    for n in range(len(indices)):
+        i = indices[n]
+        vx = landmarks[i, 0] - line_point[0]
+        vy = landmarks[i, 1] - line_point[1]
+        if landmarks.shape[1] == 2:
+            distances[n] = abs(vx * dy - vy * dx)
+        else:
+            dz = line_direction[2]
+            vz = landmarks[i, 2] - line_point[2]
+            cx = vy * dz - vz * dy
+            cy = vz * dx - vx * dz
+            cz = vx * dy - vy * dx
+            distances[n] = math.sqrt(cx * cx + cy * cy + cz * cz)
+    return distances
+
+@numba.njit(cache=True)
+def _feature_symmetry(landmarks, left_indices, right_indices, midpoint, direction):
+    """Symmetry score of paired features (0 = perfect symmetry)."""
+    left = _line_distances(landmarks, left_indices, midpoint, direction)
+    right = _line_distances(landmarks, right_indices, midpoint, direction)
+    
+    count = min(len(left), len(right))
+    diff_total = 0.0
+    for n in range(count):
+        diff_total += abs(left[n] - right[n])
+    max_distance = max(left.max(), right.max())
+    
+    return (diff_total / count) / max_distance if max_distance > 0 else 0.0
+
+@numba.njit(cache=True, fastmath=True)
+def landmark_distances(landmarks, left_eye, right_eye, nose_tip, nose_bridge, mouth, out):
+    """Write key landmark distances into out.
+    
+    Slots: left_eye_width, right_eye_width, eye_separation, nose_height,
+    mouth_width.
+    """
+    out[0] = _distance(landmarks, left_eye[0], left_eye[-1])
+    out[1] = _distance(landmarks, right_eye[0], right_eye[-1])
+    
+    left_center = _centroid(landmarks, left_eye)
+    right_center = _centroid(landmarks, right_eye)
+    total = 0.0
+    for k in range(landmarks.shape[1]):
+        d = left_center[k] - right_center[k]
+        total += d * d
+    out[2] = math.sqrt(total)
+    
+    out[3] = _distance(landmarks, nose_tip, nose_bridge[0])
+    out[4] = _distance(landmarks, mouth[0], mouth[1])
+
+@numba.njit(cache=True, fastmath=True)
+def landmark_angles(landmarks, left_eye, right_eye, left_eyebrow, right_eyebrow,
+                    nose_bridge, out):
+    """Write feature angles in degrees into out.
+    
+    Slots: left_eye_angle, right_eye_angle, left_eyebrow_angle,
+    right_eyebrow_angle, nose_bridge_angle (relative to vertical).
+    """
+    out[0] = _feature_angle(landmarks, left_eye)
+    out[1] = _feature_angle(landmarks, right_eye)
+    out[2] = _feature_angle(landmarks, left_eyebrow)
+    out[3] = _feature_angle(landmarks, right_eyebrow)
+    
+    first, last = nose_bridge[0], nose_bridge[-1]
+    out[4] = math.degrees(math.atan2(landmarks[last, 0] - landmarks[first, 0],
+                                     landmarks[last, 1] - landmarks[first, 1]))
+
+@numba.njit(cache=True, fastmath=True)
+def landmark_symmetry(landmarks, left_eye, right_eye, left_eyebrow, right_eyebrow,
+                      nose_bridge, out):
+    """Write feature symmetry scores relative to the facial midline into out.
+    
+    Slots: eye_symmetry, eyebrow_symmetry.
+    """
+    dims = landmarks.shape[1]
+    first, last = nose_bridge[0], nose_bridge[-1]
+    
+    # Facial midline from the nose bridge
+    direction = np.empty(dims)
+    midpoint = np.empty(dims)
+    for k in range(dims):
+        direction[k] = landmarks[last, k] - landmarks[first, k]
+        midpoint[k] = (landmarks[last, k] + landmarks[first, k]) / 2
+    direction /= math.sqrt((direction * direction).sum())
+    
+    out[0] = _feature_symmetry(landmarks, left_eye, right_eye, midpoint, direction)
+    out[1] = _feature_symmetry(landmarks, left_eyebrow, right_eyebrow, midpoint, direction)
@@ -0,0 +1,14 @@
+"""Lightweight norms for the tiny vectors used in facial feature analysis.
+
+np.linalg.norm spends most of its time on argument handling for 3-vectors
+and short point lists, so these helpers use plain dot products instead.
+"""
+import numpy as np
+
+def vector_norm(d: np.ndarray) -> float:
+    """Euclidean length of a single vector."""
+    return float(np.dot(d, d)) ** 0.5
+
+def row_norms(d: np.ndarray) -> np.ndarray:
+    """Euclidean length of each row of a 2D array."""
+    return np.sqrt(np.einsum('ij,ij->i', d, d))
@@ -4,6 +4,10 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional
 from enum import Enum
 
+from .._expression_metrics_numba import movement_means
+from ._vector_math import row_norms, vector_norm
+from .feature_indices import FeatureIndices
+
 class Expression(Enum):
     """Enumeration of basic facial expressions."""
     NEUTRAL = "neutral"
@@ -32,9 +36,19 @@ class ExpressionAnalyzer:
             neutral_threshold: Threshold for considering an expression neutral
         """
         self.feature_indices = feature_indices
+        self.idx = FeatureIndices.from_dict(feature_indices)
         self.neutral_threshold = neutral_threshold
         self.previous_landmarks = None
         
+        # Flattened feature indices for the compiled movement kernel
+        index_groups = [np.atleast_1d(np.asarray(indices, dtype=np.int32))
+                        for indices in feature_indices.values()]
+        self._feature_names = list(feature_indices.keys())
+        self._feat_idx_flat = (np.concatenate(index_groups) if index_groups
+                               else np.empty(0, dtype=np.int32))
+        self._feat_offsets = np.zeros(len(index_groups) + 1, dtype=np.int32)
+        self._feat_offsets[1:] = np.cumsum([len(group) for group in index_groups])
+        
     def analyze_expression(self, landmarks: np.ndarray) -> ExpressionFeatures:
         """Analyze facial expression from landmarks.
         
@@ -44,6 +58,8 @@ class ExpressionAnalyzer:
         Returns:
             ExpressionFeatures object containing expression analysis
         """
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        
         # Calculate expression metrics
         expression_metrics = self._calculate_expression_metrics(landmarks)
         
@@ -77,19 +93,19 @@ class ExpressionAnalyzer:
         metrics = {}
         
         # Mouth metrics
-        mouth_points = landmarks[self.feature_indices['mouth']]
+        mouth_points = landmarks[self.idx.mouth]
         metrics['mouth_openness'] = self._calculate_mouth_openness(mouth_points)
         metrics['mouth_width_ratio'] = self._calculate_mouth_width_ratio(mouth_points)
         
         # Eye metrics
-        left_eye_points = landmarks[self.feature_indices['left_eye']]
-        right_eye_points = landmarks[self.feature_indices['right_eye']]
+        left_eye_points = landmarks[self.idx.left_eye]
+        right_eye_points = landmarks[self.idx.right_eye]
         metrics['left_eye_openness'] = self._calculate_eye_openness(left_eye_points)
         metrics['right_eye_openness'] = self._calculate_eye_openness(right_eye_points)
         
         # Eyebrow metrics
-        left_brow_points = landmarks[self.feature_indices['left_eyebrow']]
-        right_brow_points = landmarks[self.feature_indices['right_eyebrow']]
+        left_brow_points = landmarks[self.idx.left_eyebrow]
+        right_brow_points = landmarks[self.idx.right_eyebrow]
         metrics['brow_height'] = self._calculate_brow_height(
             left_brow_points, right_brow_points,
             left_eye_points, right_eye_points
@@ -109,16 +125,18 @@ class ExpressionAnalyzer:
         metrics = {}
         
         if self.previous_landmarks is not None:
-            # Calculate overall movement
-            movement = landmarks - self.previous_landmarks
-            metrics['total_movement'] = float(np.mean(np.linalg.norm(movement, axis=1)))
+            # Calculate overall and feature-specific movements in one pass
+            feature_movements = np.empty(len(self._feature_names))
+            metrics['total_movement'] = float(movement_means(
+                np.ascontiguousarray(landmarks),
+                np.ascontiguousarray(self.previous_landmarks),
+                self._feat_idx_flat,
+                self._feat_offsets,
+                feature_movements
+            ))
             
-            # Calculate feature-specific movements
-            for feature_name, indices in self.feature_indices.items():
-                feature_movement = movement[indices]
-                metrics[f'{feature_name}_movement'] = float(
-                    np.mean(np.linalg.norm(feature_movement, axis=1))
-                )
+            for feature_name, movement in zip(self._feature_names, feature_movements):
+                metrics[f'{feature_name}_movement'] = float(movement)
         
         return metrics
     
@@ -175,21 +193,21 @@ class ExpressionAnalyzer:
         """Calculate relative mouth openness."""
         top_point = mouth_points[2]  # top middle point
         bottom_point = mouth_points[3]  # bottom middle point
-        return float(np.linalg.norm(top_point - bottom_point))
+        return vector_norm(top_point - bottom_point)
     
     @staticmethod
     def _calculate_mouth_width_ratio(mouth_points: np.ndarray) -> float:
         """Calculate mouth width relative to neutral position."""
         left_point = mouth_points[0]
         right_point = mouth_points[1]
-        return float(np.linalg.norm(right_point - left_point))
+        return vector_norm(right_point - left_point)
     
     @staticmethod
     def _calculate_eye_openness(eye_points: np.ndarray) -> float:
         """Calculate relative eye openness."""
         top_points = eye_points[1:4]  # upper eyelid points
         bottom_points = eye_points[4:7]  # lower eyelid points
-        return float(np.mean(np.linalg.norm(top_points - bottom_points, axis=1)))
+        return float(np.mean(row_norms(top_points - bottom_points)))
     
     @staticmethod
     def _calculate_brow_height(left_brow: np.ndarray, right_brow: np.ndarray,
@@ -0,0 +1,42 @@
+"""Array-backed facial feature index groups."""
+import numpy as np
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Union
+
+@dataclass(frozen=True)
+class FeatureIndices:
+    """Landmark index arrays for each facial feature group.
+    
+    Built once from the feature index dictionary so per-frame code indexes
+    landmarks with ready-made integer arrays instead of dict lookups and
+    list conversions. Groups missing from the dictionary are None.
+    """
+    mouth: Optional[np.ndarray] = None
+    left_eye: Optional[np.ndarray] = None
+    right_eye: Optional[np.ndarray] = None
+    left_eyebrow: Optional[np.ndarray] = None
+    right_eyebrow: Optional[np.ndarray] = None
+    nose_bridge: Optional[np.ndarray] = None
+    face_contour: Optional[np.ndarray] = None
+    nose_tip: Optional[int] = None
+    
+    @classmethod
+    def from_dict(cls, feature_indices: Dict[str, Union[int, List[int]]]) -> 'FeatureIndices':
+        """Create from a dictionary mapping feature names to landmark indices.
+        
+        Args:
+            feature_indices: Dictionary mapping feature names to landmark indices
+            
+        Returns:
+            FeatureIndices object
+        """
+        values = {}
+        for field in fields(cls):
+            if field.name not in feature_indices:
+                continue
+            indices = feature_indices[field.name]
+            if isinstance(indices, (list, tuple, np.ndarray)):
+                values[field.name] = np.asarray(indices, dtype=np.intp)
+            else:
+                values[field.name] = int(indices)
+        return cls(**values)
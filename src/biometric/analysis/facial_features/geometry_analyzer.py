@@ -4,17 +4,63 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 from scipy.spatial.transform import Rotation
 
+from ._contour_metrics_numba import contour_metrics
+from ._vector_math import row_norms, vector_norm
+from .feature_indices import FeatureIndices
+
+# Canonical 3D points for pose estimation, and their centered form
+_CANONICAL_POINTS = np.array([
+    [0.0, 0.0, 0.0],    # Nose tip
+    [-1.0, 0.0, 0.0],   # Left eye
+    [1.0, 0.0, 0.0],    # Right eye
+    [0.0, -1.0, 0.0],   # Mouth center
+    [0.0, 1.0, 0.0]     # Bridge of nose
+], dtype=np.float32)
+_CANONICAL_CENTERED = _CANONICAL_POINTS - _CANONICAL_POINTS.mean(axis=0)
+
+@dataclass
+class Proportions:
+    """Facial proportions and ratios."""
+    width_height_ratio: float
+    eye_spacing_ratio: float
+    nose_face_ratio: float
+    mouth_face_ratio: float
+
+@dataclass
+class HeadPose:
+    """Head pose angles in degrees."""
+    pitch: float  # up/down
+    yaw: float    # left/right
+    roll: float   # tilt
+
+@dataclass
+class FaceShape:
+    """Overall face shape metrics."""
+    jaw_width: float
+    roundness: float
+    jaw_angle: float
+
+@dataclass
+class ContourMetrics:
+    """Facial contour metrics."""
+    length: float
+    smoothness: float
+    symmetry: float
+
 @dataclass
 class GeometricFeatures:
     """Container for geometric facial features."""
-    proportions: Dict[str, float]
-    head_pose: Dict[str, float]
-    face_shape: Dict[str, float]
-    contour_metrics: Dict[str, float]
+    proportions: Proportions
+    head_pose: HeadPose
+    face_shape: FaceShape
+    contour_metrics: ContourMetrics
 
 class GeometryAnalyzer:
     """Analyzes geometric properties of facial features."""
     
+    # Solve head pose rotations with Horn's quaternion method instead of SVD
+    USE_QUATERNION_ROTATION = True
+    
     def __init__(self, feature_indices: Dict[str, List[int]]):
         """Initialize the geometry analyzer.
         
@@ -22,6 +68,8 @@ class GeometryAnalyzer:
             feature_indices: Dictionary mapping feature names to landmark indices
         """
         self.feature_indices = feature_indices
+        self.idx = FeatureIndices.from_dict(feature_indices)
+        self._pose_weights = None
         
     def analyze_geometry(self, landmarks: np.ndarray) -> GeometricFeatures:
         """Analyze geometric properties of facial landmarks.
@@ -32,6 +80,7 @@ class GeometryAnalyzer:
         Returns:
             GeometricFeatures object containing geometric analysis
         """
+        landmarks = np.asarray(landmarks, dtype=np.float32)
         return GeometricFeatures(
             proportions=self.calculate_proportions(landmarks),
             head_pose=self.estimate_head_pose(landmarks),
@@ -39,167 +88,203 @@ class GeometryAnalyzer:
             contour_metrics=self.analyze_face_contour(landmarks)
         )
     
-    def calculate_proportions(self, landmarks: np.ndarray) -> Dict[str, float]:
+    def calculate_proportions(self, landmarks: np.ndarray) -> Proportions:
         """Calculate facial proportions and ratios.
         
         Args:
             landmarks: Nx3 array of landmark coordinates
             
         Returns:
-            Dictionary of facial proportions
+            Proportions object of facial proportions
         """
-        proportions = {}
-        
         # Face width to height ratio
-        contour_points = landmarks[self.feature_indices['face_contour']]
-        face_width = np.max(contour_points[:, 0]) - np.min(contour_points[:, 0])
-        face_height = np.max(contour_points[:, 1]) - np.min(contour_points[:, 1])
-        proportions['width_height_ratio'] = float(face_width / face_height)
+        contour_points = landmarks[self.idx.face_contour]
+        face_width = np.ptp(contour_points[:, 0])
+        face_height = np.ptp(contour_points[:, 1])
         
         # Eye spacing proportions
-        left_eye = np.mean(landmarks[self.feature_indices['left_eye']], axis=0)
-        right_eye = np.mean(landmarks[self.feature_indices['right_eye']], axis=0)
-        eye_distance = np.linalg.norm(right_eye - left_eye)
-        proportions['eye_spacing_ratio'] = float(eye_distance / face_width)
+        left_eye = np.mean(landmarks[self.idx.left_eye], axis=0)
+        right_eye = np.mean(landmarks[self.idx.right_eye], axis=0)
+        eye_distance = vector_norm(right_eye - left_eye)
         
         # Nose proportions
-        nose_bridge = landmarks[self.feature_indices['nose_bridge']]
-        nose_length = np.linalg.norm(nose_bridge[-1] - nose_bridge[0])
-        proportions['nose_face_ratio'] = float(nose_length / face_height)
+        nose_bridge = landmarks[self.idx.nose_bridge]
+        nose_length = vector_norm(nose_bridge[-1] - nose_bridge[0])
         
         # Mouth proportions
-        mouth_points = landmarks[self.feature_indices['mouth']]
-        mouth_width = np.linalg.norm(mouth_points[0] - mouth_points[1])
-        proportions['mouth_face_ratio'] = float(mouth_width / face_width)
-        
-        return proportions
+        mouth_points = landmarks[self.idx.mouth]
+        mouth_width = vector_norm(mouth_points[0] - mouth_points[1])
+        
+        return Proportions(
+            width_height_ratio=float(face_width / face_height),
+            eye_spacing_ratio=float(eye_distance / face_width),
+            nose_face_ratio=float(nose_length / face_height),
+            mouth_face_ratio=float(mouth_width / face_width)
+        )
     
-    def estimate_head_pose(self, landmarks: np.ndarray) -> Dict[str, float]:
+    def estimate_head_pose(self, landmarks: np.ndarray) -> HeadPose:
         """Estimate 3D head pose from facial landmarks.
         
         Args:
             landmarks: Nx3 array of landmark coordinates
             
         Returns:
-            Dictionary containing head pose angles
+            HeadPose object containing head pose angles
         """
-        # Define canonical points for pose estimation
-        canonical_points = self._get_canonical_points()
+        euler_angles = self.estimate_head_pose_batch(landmarks[np.newaxis])[0]
         
-        # Get corresponding points from landmarks
-        actual_points = self._get_pose_points(landmarks)
+        return HeadPose(
+            pitch=float(euler_angles[0]),
+            yaw=float(euler_angles[1]),
+            roll=float(euler_angles[2])
+        )
+    
+    def estimate_head_pose_batch(self, landmarks_stack: np.ndarray) -> np.ndarray:
+        """Estimate 3D head pose for a stack of frames at once.
         
-        # Estimate rotation matrix
-        rotation_matrix = self._estimate_rotation(actual_points, canonical_points)
+        Args:
+            landmarks_stack: FxNx3 array of landmark coordinates
+            
+        Returns:
+            Fx3 array of (pitch, yaw, roll) angles in degrees
+        """
+        # Get points corresponding to the canonical pose points
+        landmarks_stack = np.asarray(landmarks_stack, dtype=np.float32)
+        actual_points = self._get_pose_points_batch(landmarks_stack)
         
-        # Convert to Euler angles
-        euler_angles = rotation_matrix.as_euler('xyz', degrees=True)
+        # Estimate rotation matrices
+        rotations = self._estimate_rotation_batch(actual_points)
         
-        return {
-            'pitch': float(euler_angles[0]),  # up/down
-            'yaw': float(euler_angles[1]),    # left/right
-            'roll': float(euler_angles[2])    # tilt
-        }
+        # Convert to Euler angles
+        return rotations.as_euler('xyz', degrees=True)
     
-    def analyze_face_shape(self, landmarks: np.ndarray) -> Dict[str, float]:
+    def analyze_face_shape(self, landmarks: np.ndarray) -> FaceShape:
         """Analyze overall face shape characteristics.
         
         Args:
             landmarks: Nx3 array of landmark coordinates
             
         Returns:
-            Dictionary of face shape metrics
+            FaceShape object of face shape metrics
         """
-        shape_metrics = {}
-        
         # Get face contour points
-        contour = landmarks[self.feature_indices['face_contour']]
-        
-        # Calculate face shape metrics
-        shape_metrics['jaw_width'] = float(
-            np.linalg.norm(contour[0] - contour[-1])
-        )
+        contour = landmarks[self.idx.face_contour]
         
         # Calculate face roundness
-        center = np.mean(contour, axis=0)
-        distances = np.linalg.norm(contour - center, axis=1)
-        shape_metrics['roundness'] = float(
-            1.0 - np.std(distances) / np.mean(distances)
-        )
+        distances = row_norms(contour - contour.mean(axis=0))
         
-        # Calculate jaw angle
-        jaw_angle = self._calculate_jaw_angle(contour)
-        shape_metrics['jaw_angle'] = float(jaw_angle)
-        
-        return shape_metrics
+        return FaceShape(
+            jaw_width=float(vector_norm(contour[0] - contour[-1])),
+            roundness=float(1.0 - np.std(distances) / np.mean(distances)),
+            jaw_angle=float(self._calculate_jaw_angle(contour))
+        )
     
-    def analyze_face_contour(self, landmarks: np.ndarray) -> Dict[str, float]:
+    def analyze_face_contour(self, landmarks: np.ndarray) -> ContourMetrics:
         """Analyze facial contour properties.
         
         Args:
             landmarks: Nx3 array of landmark coordinates
             
         Returns:
-            Dictionary of contour metrics
+            ContourMetrics object of contour metrics
         """
-        contour_metrics = {}
-        
-        # Get face contour points
-        contour = landmarks[self.feature_indices['face_contour']]
+        # Length, smoothness and symmetry in one compiled pass over the contour
+        length, smoothness, symmetry = contour_metrics(
+            np.ascontiguousarray(landmarks[self.idx.face_contour])
+        )
         
-        # Calculate contour length
-        contour_length = np.sum(
-            np.linalg.norm(contour[1:] - contour[:-1], axis=1)
+        return ContourMetrics(
+            length=float(length),
+            smoothness=float(smoothness),
+            symmetry=float(symmetry)
         )
-        contour_metrics['length'] = float(contour_length)
+    
+    def _get_pose_weights(self, num_landmarks: int) -> np.ndarray:
+        """Get the 5xN matrix that averages landmarks into pose points.
         
-        # Calculate contour smoothness
-        smoothness = self._calculate_contour_smoothness(contour)
-        contour_metrics['smoothness'] = float(smoothness)
+        Rows select the nose tip, the left eye, right eye and mouth centroids,
+        and the top of the nose bridge, so pose points for a whole stack of
+        frames come from a single matrix product.
+        """
+        if self._pose_weights is None or self._pose_weights.shape[1] != num_landmarks:
+            groups = [
+                [self.idx.nose_tip],
+                self.idx.left_eye,
+                self.idx.right_eye,
+                self.idx.mouth,
+                [self.idx.nose_bridge[0]]
+            ]
+            weights = np.zeros((len(groups), num_landmarks), dtype=np.float32)
+            for row, indices in enumerate(groups):
+                np.add.at(weights[row], indices, 1.0 / len(indices))
+            self._pose_weights = weights
+        return self._pose_weights
+    
+    def _get_pose_points_batch(self, landmarks_stack: np.ndarray) -> np.ndarray:
+        """Extract Fx5x3 points for pose estimation from a landmark stack."""
+        weights = self._get_pose_weights(landmarks_stack.shape[1])
+        return np.einsum('kn,fnd->fkd', weights, landmarks_stack)
+    
+    def _estimate_rotation_batch(self, points: np.ndarray,
+                                 centered_canonical: np.ndarray = _CANONICAL_CENTERED) -> Rotation:
+        """Estimate rotations from batched point correspondences.
+        
+        Args:
+            points: FxKx3 array of observed points
+            centered_canonical: Kx3 array of canonical points, already centered
+            
+        Returns:
+            Rotation object holding F rotations
+        """
+        # Center the observed points
+        centered_points = points - points.mean(axis=1, keepdims=True)
         
-        # Calculate contour symmetry
-        symmetry = self._calculate_contour_symmetry(contour)
-        contour_metrics['symmetry'] = float(symmetry)
+        # Cross-covariance between observed and canonical points
+        H = centered_points.transpose(0, 2, 1) @ centered_canonical
         
-        return contour_metrics
+        if self.USE_QUATERNION_ROTATION:
+            return self._rotation_from_covariance_quaternion(H)
+        return self._rotation_from_covariance_svd(H)
     
     @staticmethod
-    def _get_canonical_points() -> np.ndarray:
-        """Get canonical 3D points for pose estimation."""
-        return np.array([
-            [0.0, 0.0, 0.0],    # Nose tip
-            [-1.0, 0.0, 0.0],   # Left eye
-            [1.0, 0.0, 0.0],    # Right eye
-            [0.0, -1.0, 0.0],   # Mouth center
-            [0.0, 1.0, 0.0]     # Bridge of nose
-        ])
-    
-    def _get_pose_points(self, landmarks: np.ndarray) -> np.ndarray:
-        """Extract points for pose estimation from landmarks."""
-        return np.array([
-            landmarks[self.feature_indices['nose_tip']],
-            np.mean(landmarks[self.feature_indices['left_eye']], axis=0),
-            np.mean(landmarks[self.feature_indices['right_eye']], axis=0),
-            np.mean(landmarks[self.feature_indices['mouth']], axis=0),
-            landmarks[self.feature_indices['nose_bridge'][0]]
-        ])
+    def _rotation_from_covariance_quaternion(H: np.ndarray) -> Rotation:
+        """Solve for rotations with Horn's closed-form quaternion method.
+        
+        The optimal rotation is the eigenvector of the largest eigenvalue of a
+        symmetric 4x4 matrix built from the 3x3 cross-covariance, which avoids
+        the reflection handling of the SVD solution.
+        """
+        Sxx, Sxy, Sxz = H[:, 0, 0], H[:, 0, 1], H[:, 0, 2]
+        Syx, Syy, Syz = H[:, 1, 0], H[:, 1, 1], H[:, 1, 2]
+        Szx, Szy, Szz = H[:, 2, 0], H[:, 2, 1], H[:, 2, 2]
+        
+        N = np.empty((len(H), 4, 4), dtype=H.dtype)
+        N[:, 0, 0] = Sxx + Syy + Szz
+        N[:, 1, 1] = Sxx - Syy - Szz
+        N[:, 2, 2] = -Sxx + Syy - Szz
+        N[:, 3, 3] = -Sxx - Syy + Szz
+        N[:, 0, 1] = N[:, 1, 0] = Syz - Szy
+        N[:, 0, 2] = N[:, 2, 0] = Szx - Sxz
+        N[:, 0, 3] = N[:, 3, 0] = Sxy - Syx
+        N[:, 1, 2] = N[:, 2, 1] = Sxy + Syx
+        N[:, 1, 3] = N[:, 3, 1] = Szx + Sxz
+        N[:, 2, 3] = N[:, 3, 2] = Syz + Szy
+        
+        # Eigenvalues are ascending; quaternions come out as (w, x, y, z)
+        _, eigenvectors = np.linalg.eigh(N)
+        quaternions = eigenvectors[:, :, -1]
+        
+        return Rotation.from_quat(quaternions[:, [1, 2, 3, 0]])
     
     @staticmethod
-    def _estimate_rotation(points: np.ndarray, canonical_points: np.ndarray) -> Rotation:
-        """Estimate rotation matrix from point correspondences."""
-        # Center the points
-        centered_points = points - np.mean(points, axis=0)
-        centered_canonical = canonical_points - np.mean(canonical_points, axis=0)
-        
-        # Calculate rotation matrix using SVD
-        H = centered_points.T @ centered_canonical
+    def _rotation_from_covariance_svd(H: np.ndarray) -> Rotation:
+        """Solve for rotations with the SVD-based Kabsch method."""
         U, _, Vt = np.linalg.svd(H)
-        R = Vt.T @ U.T
         
-        # Ensure proper rotation matrix
-        if np.linalg.det(R) < 0:
-            Vt[-1, :] *= -1
-            R = Vt.T @ U.T
+        # Ensure proper rotation matrices
+        d = np.where(np.linalg.det(U @ Vt) < 0, -1.0, 1.0)
+        Vt[:, -1, :] *= d[:, np.newaxis]
+        R = Vt.transpose(0, 2, 1) @ U.transpose(0, 2, 1)
         
         return Rotation.from_matrix(R)
     
@@ -214,40 +299,5 @@ class GeometryAnalyzer:
         right_vector = np.mean(np.diff(right_jaw, axis=0), axis=0)
         
         angle = np.arccos(np.dot(left_vector, right_vector) /
-                         (np.linalg.norm(left_vector) * np.linalg.norm(right_vector)))
+                         (vector_norm(left_vector) * vector_norm(right_vector)))
         return np.degrees(angle)
-    
-    @staticmethod
-    def _calculate_contour_smoothness(contour: np.ndarray) -> float:
-        """Calculate smoothness of the contour."""
-        # Calculate second derivatives along the contour
-        second_derivatives = np.diff(contour, n=2, axis=0)
-        curvature = np.linalg.norm(second_derivatives, axis=1)
-        
-        # Normalize and invert so higher values mean smoother
-        return 1.0 / (1.0 + np.mean(curvature))
-    
-    @staticmethod
-    def _calculate_contour_symmetry(contour: np.ndarray) -> float:
-        """Calculate symmetry of the face contour."""
-        # Find vertical axis
-        center_line = np.mean(contour, axis=0)[0]
-        
-        # Split points into left and right
-        left_points = contour[contour[:, 0] < center_line]
-        right_points = contour[contour[:, 0] > center_line]
-        
-        # Mirror right points
-        right_points_mirrored = right_points.copy()
-        right_points_mirrored[:, 0] = 2 * center_line - right_points_mirrored[:, 0]
-        
-        # Calculate average distance between corresponding points
-        min_points = min(len(left_points), len(right_points_mirrored))
-        left_points = left_points[:min_points]
-        right_points_mirrored = right_points_mirrored[:min_points]
-        
-        asymmetry = np.mean(np.linalg.norm(left_points - right_points_mirrored, axis=1))
-        
-        # Convert to symmetry score (1 = perfect symmetry, 0 = maximum asymmetry)
-        face_width = np.max(contour[:, 0]) - np.min(contour[:, 0])
-        return 1.0 - (asymmetry / face_width)
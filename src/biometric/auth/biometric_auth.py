@@ -1,6 +1,121 @@
 import numpy as np
+from dataclasses import fields, is_dataclass
 from pathlib import Path
-import json
+import orjson
+
+def _flatten_metrics(data, prefix=""):
+    """Flatten nested metric dataclasses or dicts into one level.
+
+    Nested names are joined with dots, e.g. GeometricFeatures becomes keys
+    like "proportions.width_height_ratio". Flat dicts are returned as is.
+    """
+    if is_dataclass(data):
+        items = [(field.name, getattr(data, field.name)) for field in fields(data)]
+    else:
+        items = data.items()
+
+    flat = {}
+    for name, value in items:
+        key = prefix + name
+        if is_dataclass(value) or isinstance(value, dict):
+            flat.update(_flatten_metrics(value, key + "."))
+        else:
+            flat[key] = value
+    return flat
+
+class GalleryIndex:
+    """Enrolled profiles stacked into aligned arrays for 1:N identification."""
+
+    POSE_AXES = ["pitch", "yaw", "roll"]
+
+    def __init__(self, profiles, tolerance_thresholds):
+        """Stack profile means as (profiles, metrics) arrays.
+
+        Metrics a profile lacks are stored as NaN and skipped when scoring.
+        """
+        self.profile_ids = list(profiles.keys())
+        profile_list = list(profiles.values())
+
+        self.geometry_keys = []
+        for profile in profile_list:
+            for metric in profile.get("geometry") or {}:
+                if metric not in self.geometry_keys:
+                    self.geometry_keys.append(metric)
+
+        self.geometry_means = self._stack_means(
+            [profile.get("geometry") for profile in profile_list], self.geometry_keys
+        )
+        self.geometry_thresholds = np.array(
+            [tolerance_thresholds.get(k, 0.1) for k in self.geometry_keys], dtype=np.float64
+        )
+        self.pose_means = self._stack_means(
+            [profile.get("pose") for profile in profile_list], self.POSE_AXES
+        )
+        self.pose_thresholds = np.array(
+            [tolerance_thresholds[axis] for axis in self.POSE_AXES], dtype=np.float64
+        )
+
+        self.color_means = np.full((len(profile_list), 3), np.nan)
+        for i, profile in enumerate(profile_list):
+            if profile.get("color"):
+                self.color_means[i] = profile["color"]["mean"]
+        self.color_scale = tolerance_thresholds["color_tolerance"] * np.sqrt(3)
+
+    @staticmethod
+    def _stack_means(sections, keys):
+        """Stack per-profile metric means into a (profiles, keys) array."""
+        means = np.full((len(sections), len(keys)), np.nan)
+        for i, section in enumerate(sections):
+            if not section:
+                continue
+            for j, key in enumerate(keys):
+                if key in section:
+                    means[i, j] = section[key]["mean"]
+        return means
+
+    @staticmethod
+    def _category_scores(current, means, max_allowed_diff):
+        """Mean per-profile match score over metrics present on both sides."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.maximum(0.0, 1.0 - np.abs(current - means) / max_allowed_diff)
+        valid = ~np.isnan(means) & ~np.isnan(current)
+        counts = valid.sum(axis=1)
+        totals = np.where(valid, scores, 0.0).sum(axis=1)
+        return np.divide(totals, counts, out=np.zeros(len(means)), where=counts > 0)
+
+    def score(self, current_data):
+        """Compute overall match scores of the current data against every profile.
+
+        Args:
+            current_data: Current biometric data in the same layout as a profile
+
+        Returns:
+            Array of overall scores, one per enrolled profile
+        """
+        num_profiles = len(self.profile_ids)
+
+        geometry = _flatten_metrics(current_data.get("geometry") or {})
+        current = np.array([geometry.get(k, np.nan) for k in self.geometry_keys],
+                           dtype=np.float64)
+        geometry_scores = self._category_scores(
+            current, self.geometry_means, self.geometry_means * self.geometry_thresholds
+        )
+
+        pose = _flatten_metrics(current_data.get("pose") or {})
+        current = np.array([pose.get(axis, np.nan) for axis in self.POSE_AXES],
+                           dtype=np.float64)
+        pose_scores = self._category_scores(current, self.pose_means, self.pose_thresholds)
+
+        color = current_data.get("color")
+        if color:
+            color_diff = np.sqrt(np.einsum(
+                "ij,ij->i", self.color_means - color, self.color_means - color
+            ))
+            color_scores = np.nan_to_num(np.maximum(0.0, 1.0 - color_diff / self.color_scale))
+        else:
+            color_scores = np.zeros(num_profiles)
+
+        return (geometry_scores + pose_scores + color_scores) / 3.0
 
 class BiometricAuthenticator:
     """Handles biometric authentication using facial features."""
@@ -33,6 +148,8 @@ class BiometricAuthenticator:
             # Color variation (BGR values, 0-255)
             "color_tolerance": 25.0
         }
+        self.match_threshold = 0.8
+        self.gallery = None
 
     def create_biometric_profile(self, session_data):
         """Create a biometric profile from session data."""
@@ -48,15 +165,22 @@ class BiometricAuthenticator:
         if not geometry_data:
             return None
 
-        # Convert list of measurements to numpy array for each metric
+        # Stack all measurements into a (frames, metrics) array and reduce once
+        frames = [_flatten_metrics(frame) for frame in geometry_data]
+        keys = list(frames[0].keys())
+        values = np.array([[frame[k] for k in keys] for frame in frames], dtype=np.float32)
+        means = values.mean(axis=0)
+        stds = values.std(axis=0)
+        mins = values.min(axis=0)
+        maxs = values.max(axis=0)
+
         metrics = {}
-        for metric in geometry_data[0].keys():
-            values = [frame[metric] for frame in geometry_data]
+        for i, metric in enumerate(keys):
             metrics[metric] = {
-                "mean": float(np.mean(values)),
-                "std": float(np.std(values)),
-                "min": float(np.min(values)),
-                "max": float(np.max(values))
+                "mean": float(means[i]),
+                "std": float(stds[i]),
+                "min": float(mins[i]),
+                "max": float(maxs[i])
             }
         return metrics
 
@@ -65,13 +189,23 @@ class BiometricAuthenticator:
         if not pose_data:
             return None
 
+        axes = ["pitch", "yaw", "roll"]
+        if is_dataclass(pose_data[0]):
+            values = np.array([[getattr(frame, axis) for axis in axes] for frame in pose_data],
+                              dtype=np.float32)
+        else:
+            values = np.array([[frame[axis] for axis in axes] for frame in pose_data],
+                              dtype=np.float32)
+        means = values.mean(axis=0)
+        stds = values.std(axis=0)
+        ranges = np.ptp(values, axis=0)
+
         pose_metrics = {}
-        for axis in ["pitch", "yaw", "roll"]:
-            values = [frame[axis] for frame in pose_data]
+        for i, axis in enumerate(axes):
             pose_metrics[axis] = {
-                "mean": float(np.mean(values)),
-                "std": float(np.std(values)),
-                "range": float(np.ptp(values))
+                "mean": float(means[i]),
+                "std": float(stds[i]),
+                "range": float(ranges[i])
             }
         return pose_metrics
 
@@ -80,10 +214,10 @@ class BiometricAuthenticator:
         if not color_data:
             return None
 
-        color_array = np.array(color_data)
+        color_array = np.array(color_data, dtype=np.float32)
         return {
-            "mean": np.mean(color_array, axis=0).tolist(),
-            "std": np.std(color_array, axis=0).tolist()
+            "mean": np.mean(color_array, axis=0),
+            "std": np.std(color_array, axis=0)
         }
 
     def verify_biometric(self, profile, current_data):
@@ -114,35 +248,63 @@ class BiometricAuthenticator:
 
         overall_score = np.mean(match_scores) if match_scores else 0.0
         
-        return overall_score >= 0.8, {
+        return overall_score >= self.match_threshold, {
             "overall_score": overall_score,
             "details": results
         }
 
+    def build_gallery(self, profiles):
+        """Index enrolled profiles, keyed by profile id, for batch verification."""
+        self.gallery = GalleryIndex(profiles, self.tolerance_thresholds)
+        return self.gallery
+
+    def verify_biometric_batch(self, current_data):
+        """Score current biometric data against every profile in the gallery."""
+        if self.gallery is None or not current_data:
+            return np.zeros(0)
+        return self.gallery.score(current_data)
+
+    def identify(self, current_data, top_k=5):
+        """Find the best matching enrolled profiles for the current data.
+
+        Returns:
+            List of (profile_id, score, is_match) tuples, best match first
+        """
+        scores = self.verify_biometric_batch(current_data)
+        if len(scores) == 0:
+            return []
+
+        top_k = min(top_k, len(scores))
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        candidates = candidates[np.argsort(-scores[candidates])]
+        matched = scores[candidates] >= self.match_threshold
+
+        return [
+            (self.gallery.profile_ids[i], float(scores[i]), bool(is_match))
+            for i, is_match in zip(candidates, matched)
+        ]
+
     def _verify_geometry(self, profile_geometry, current_geometry):
         """Verify geometric measurements."""
         if not profile_geometry or not current_geometry:
             return {"match_score": 0.0, "error": "Missing geometry data"}
 
-        matches = []
-        for metric, profile_values in profile_geometry.items():
-            if metric not in current_geometry:
-                continue
+        current_geometry = _flatten_metrics(current_geometry)
+        # Align current values, profile means and thresholds per shared metric
+        keys = [metric for metric in profile_geometry if metric in current_geometry]
+        current_values = np.array([current_geometry[k] for k in keys], dtype=np.float64)
+        profile_means = np.array([profile_geometry[k]["mean"] for k in keys], dtype=np.float64)
+        thresholds = np.array([self.tolerance_thresholds.get(k, 0.1) for k in keys],
+                              dtype=np.float64)
 
-            current_value = current_geometry[metric]
-            threshold = self.tolerance_thresholds.get(metric, 0.1)
-            
-            # Calculate normalized difference
-            diff = abs(current_value - profile_values["mean"])
-            max_allowed_diff = profile_values["mean"] * threshold
-            
-            # Calculate match score for this metric
-            match_score = max(0.0, 1.0 - (diff / max_allowed_diff))
-            matches.append(match_score)
+        # Match score per metric from the normalized difference
+        diff = np.abs(current_values - profile_means)
+        max_allowed_diff = profile_means * thresholds
+        matches = np.maximum(0.0, 1.0 - diff / max_allowed_diff).tolist()
 
         return {
             "match_score": np.mean(matches) if matches else 0.0,
-            "metric_scores": dict(zip(profile_geometry.keys(), matches))
+            "metric_scores": dict(zip(keys, matches))
         }
 
     def _verify_pose(self, profile_pose, current_pose):
@@ -150,19 +312,20 @@ class BiometricAuthenticator:
         if not profile_pose or not current_pose:
             return {"match_score": 0.0, "error": "Missing pose data"}
 
-        matches = []
-        for axis in ["pitch", "yaw", "roll"]:
-            if axis not in current_pose or axis not in profile_pose:
-                continue
+        current_pose = _flatten_metrics(current_pose)
+        axes = [axis for axis in ["pitch", "yaw", "roll"]
+                if axis in current_pose and axis in profile_pose]
+        current_values = np.array([current_pose[axis] for axis in axes], dtype=np.float64)
+        profile_means = np.array([profile_pose[axis]["mean"] for axis in axes], dtype=np.float64)
+        thresholds = np.array([self.tolerance_thresholds[axis] for axis in axes],
+                              dtype=np.float64)
 
-            threshold = self.tolerance_thresholds[axis]
-            diff = abs(current_pose[axis] - profile_pose[axis]["mean"])
-            match_score = max(0.0, 1.0 - (diff / threshold))
-            matches.append(match_score)
+        diff = np.abs(current_values - profile_means)
+        matches = np.maximum(0.0, 1.0 - diff / thresholds).tolist()
 
         return {
             "match_score": np.mean(matches) if matches else 0.0,
-            "axis_scores": dict(zip(["pitch", "yaw", "roll"], matches))
+            "axis_scores": dict(zip(axes, matches))
         }
 
     def _verify_color(self, profile_color, current_color):
@@ -185,10 +348,12 @@ class BiometricAuthenticator:
     def save_profile(self, profile, filepath):
         """Save biometric profile to file."""
         Path(filepath).parent.mkdir(parents=True, exist_ok=True)
-        with open(filepath, 'w') as f:
-            json.dump(profile, f, indent=4)
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(
+                profile, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2
+            ))
 
     def load_profile(self, filepath):
         """Load biometric profile from file."""
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
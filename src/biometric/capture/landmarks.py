@@ -2,8 +2,22 @@ import mediapipe as mp
 import numpy as np
 import cv2
 
+# MediaPipe already parallelizes inference; extra OpenCV threads only compete with it
+cv2.setNumThreads(1)
+
 class FaceLandmarkDetector:
-    def __init__(self):
+    # Landmarks per face with refine_landmarks enabled (468 mesh + 10 iris)
+    NUM_LANDMARKS = 478
+
+    def __init__(self, detection_scale=0.5):
+        """Initialize the detector.
+
+        Args:
+            detection_scale: Factor frames are resized by before detection.
+                Landmarks come back normalized, so they map onto the full
+                frame unchanged.
+        """
+        self.detection_scale = detection_scale
         self.mp_face_mesh = mp.solutions.face_mesh
         self.face_mesh = self.mp_face_mesh.FaceMesh(
             static_image_mode=False,
@@ -12,23 +26,43 @@ class FaceLandmarkDetector:
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
+        self._small_buf = None
+        self._rgb_buf = None
 
     def detect_landmarks(self, frame):
         """Detect facial landmarks in the given frame."""
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(frame_rgb)
+        if self.detection_scale != 1.0:
+            # Detect on a downscaled copy, held in a reused buffer
+            h, w = frame.shape[:2]
+            small_shape = (int(h * self.detection_scale), int(w * self.detection_scale), 3)
+            if self._small_buf is None or self._small_buf.shape != small_shape:
+                self._small_buf = np.empty(small_shape, dtype=frame.dtype)
+            cv2.resize(frame, (small_shape[1], small_shape[0]), dst=self._small_buf,
+                       interpolation=cv2.INTER_AREA)
+            frame = self._small_buf
+
+        # Convert into a reused RGB buffer instead of allocating one per frame
+        if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+            self._rgb_buf = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+        results = self.face_mesh.process(self._rgb_buf)
         return results.multi_face_landmarks[0] if results.multi_face_landmarks else None
 
     def extract_landmark_points(self, frame, face_landmarks):
         """Convert normalized MediaPipe FaceMesh landmark coordinates into pixel coordinates."""
         h, w, _ = frame.shape
-        landmark_points = []
-        for landmark in face_landmarks.landmark:
-            x_px = int(landmark.x * w)
-            y_px = int(landmark.y * h)
-            z_val = landmark.z  # Normalized depth
-            landmark_points.append([x_px, y_px, z_val])
-        return np.array(landmark_points, dtype=np.float32)
+        landmarks = face_landmarks.landmark
+        coords = np.fromiter(
+            (v for landmark in landmarks for v in (landmark.x, landmark.y, landmark.z)),
+            dtype=np.float32,
+            count=3 * len(landmarks)
+        ).reshape(-1, 3)
+
+        # Scale x, y to whole pixels (truncating like int()); z stays normalized depth
+        coords[:, 0] *= w
+        coords[:, 1] *= h
+        np.trunc(coords[:, :2], out=coords[:, :2])
+        return coords
 
     def close(self):
         """Release resources."""
@@ -1,13 +1,60 @@
+import threading
+
 import cv2
 
 class VideoCapture:
+    # Consecutive failed reads after which the capture thread gives up
+    MAX_FAILED_READS = 30
+
     def __init__(self, camera_id=0):
         self.cap = cv2.VideoCapture(camera_id)
         if not self.cap.isOpened():
             raise RuntimeError("Error: Could not open webcam.")
+        self._thread = None
+        self._stop = False
+        self._latest = None
+        self._frame_ready = threading.Condition()
+
+    def start_threaded(self, timeout=1.0):
+        """Read frames on a background thread so camera I/O overlaps processing.
+
+        Only the most recent frame is kept; stale frames are dropped.
+
+        Args:
+            timeout: Seconds read_frame waits for a new frame before returning None
+        """
+        if self._thread is not None:
+            return
+        self._read_timeout = timeout
+        self._stop = False
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+
+    def _capture_loop(self):
+        """Continuously read frames, replacing any frame not yet consumed."""
+        failed_reads = 0
+        while not self._stop:
+            success, frame = self.cap.read()
+            if not success:
+                # Stop spinning once the device is clearly gone
+                failed_reads += 1
+                if failed_reads > self.MAX_FAILED_READS:
+                    break
+                continue
+            failed_reads = 0
+            with self._frame_ready:
+                self._latest = frame
+                self._frame_ready.notify()
 
     def read_frame(self):
         """Read a frame from the video capture device."""
+        if self._thread is not None:
+            with self._frame_ready:
+                if self._latest is None and self._thread.is_alive():
+                    self._frame_ready.wait(self._read_timeout)
+                frame, self._latest = self._latest, None
+            return frame
+
         success, frame = self.cap.read()
         if not success:
             return None
@@ -15,5 +62,9 @@ class VideoCapture:
 
     def release(self):
         """Release the video capture device."""
+        if self._thread is not None:
+            self._stop = True
+            self._thread.join()
+            self._thread = None
         self.cap.release()
         cv2.destroyAllWindows()
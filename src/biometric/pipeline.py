@@ -1,7 +1,11 @@
 """Biometric analysis pipeline orchestrator."""
 import cv2
 import numpy as np
-from typing import Dict, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import os
+import queue
+import threading
 import time
 
 from .capture.video import VideoCapture
@@ -12,6 +16,7 @@ from .analysis.facial_features.expression_analyzer import ExpressionAnalyzer
 from .analysis.depth.depth_mapper import DepthMapper
 from .analysis.depth.feature_extractor import DepthFeatureExtractor
 from .analysis.depth.mesh_generator import MeshGenerator
+from .analysis.depth.quantization import QuantizedDepthMap
 from .analysis.change_detector import ChangeDetector
 from .analysis.color_analysis import ColorAnalyzer
 from .visualization.feature_visualizer import FeatureVisualizer
@@ -21,9 +26,47 @@ from .utils.config import BiometricConfig
 from .utils.data_handler import BiometricDataHandler
 from .utils.session_manager import SessionManager
 
+# Per-process depth analyzers, created once by each depth worker
+_depth_worker = {}
+
+def _init_depth_worker(resolution: Tuple[int, int], feature_indices: Dict):
+    """Create the depth analyzers used by a depth analysis worker process."""
+    _depth_worker["mapper"] = DepthMapper(resolution, feature_indices)
+    _depth_worker["extractor"] = DepthFeatureExtractor(feature_indices)
+    _depth_worker["mesh"] = MeshGenerator()
+
+def _analyze_depth_chunk(landmarks_stack: np.ndarray) -> Tuple[List[QuantizedDepthMap],
+                                                                List[Dict], List[Dict]]:
+    """Run depth mapping, feature extraction and meshing on a chunk of frames.
+    
+    Depth maps are returned quantized to 8 bits to keep stored results small.
+    """
+    depth_maps = _depth_worker["mapper"].create_depth_map_batch(landmarks_stack)
+    return (
+        [QuantizedDepthMap.from_depth_map(depth_map) for depth_map in depth_maps],
+        [_depth_worker["extractor"].calculate_depth_features(landmarks)
+         for landmarks in landmarks_stack],
+        [_depth_worker["mesh"].create_3d_mesh(landmarks) for landmarks in landmarks_stack]
+    )
+
 class BiometricPipeline:
     """Orchestrates the biometric analysis pipeline."""
     
+    # Frames buffered between capture stages before back-pressure applies
+    CAPTURE_QUEUE_SIZE = 4
+    
+    # Frames sent to each depth analysis worker per task
+    DEPTH_CHUNK_SIZE = 8
+    
+    # Consecutive missing frames after which the camera is treated as gone
+    MAX_EMPTY_FRAMES = 30
+    
+    # Show only every Nth stored frame in the progress window
+    DISPLAY_STRIDE = 2
+    
+    # Marks the end of a stage's stream
+    _END_OF_STREAM = None
+    
     def __init__(self, config: BiometricConfig):
         """Initialize the pipeline with configuration.
         
@@ -37,8 +80,18 @@ class BiometricPipeline:
         """Initialize all pipeline components."""
         # Capture components
         self.video_capture = VideoCapture()
+        self.video_capture.start_threaded()
         self.landmark_detector = FaceLandmarkDetector()
         
+        # Preallocated (frames, landmarks, 3) store for frames kept during capture
+        self._landmark_buffer = np.empty(
+            (self.config.capture.max_stored_frames, FaceLandmarkDetector.NUM_LANDMARKS, 3),
+            dtype=np.float32
+        )
+        self._frame_buffer = self._allocate_frame_buffer(
+            (self.config.capture.frame_height, self.config.capture.frame_width, 3)
+        )
+        
         # Analysis components
         self.landmark_analyzer = LandmarkAnalyzer(self.landmark_detector.FEATURE_INDICES)
         self.geometry_analyzer = GeometryAnalyzer(self.landmark_detector.FEATURE_INDICES)
@@ -61,6 +114,11 @@ class BiometricPipeline:
         self.data_handler = BiometricDataHandler(self.config.storage.base_dir)
         self.session_manager = SessionManager(self.config.storage.base_dir)
         
+    def _allocate_frame_buffer(self, frame_shape: Tuple[int, ...]) -> np.ndarray:
+        """Allocate the store for frames kept during capture."""
+        return np.empty((self.config.capture.max_stored_frames,) + tuple(frame_shape),
+                        dtype=np.uint8)
+        
     def run_capture_phase(self, duration: int = 10) -> Tuple[str, Dict]:
         """Run the initial capture phase.
         
@@ -85,41 +143,155 @@ class BiometricPipeline:
         print(f"\nStarting capture phase (Session: {session_id})")
         print("Please maintain a neutral expression and follow the prompts...")
         
-        while (time.time() - start_time) < duration:
-            # Capture and process frame
+        # Reader and visualizer run on their own threads; stateful analyzers stay here
+        read_queue = queue.Queue(maxsize=self.CAPTURE_QUEUE_SIZE)
+        vis_queue = queue.Queue(maxsize=self.CAPTURE_QUEUE_SIZE)
+        stop_event = threading.Event()
+        reader = threading.Thread(
+            target=self._read_frames,
+            args=(read_queue, stop_event, start_time + duration),
+            daemon=True
+        )
+        visualizer = threading.Thread(
+            target=self._show_progress, args=(vis_queue, stop_event), daemon=True
+        )
+        reader.start()
+        visualizer.start()
+        num_stored = 0
+        frame_idx = 0
+        
+        try:
+            while True:
+                frame = read_queue.get()
+                if frame is self._END_OF_STREAM:
+                    break
+                if num_stored == len(self._landmark_buffer):
+                    continue
+                    
+                # Consecutive frames barely differ, so only analyze every Nth one
+                frame_idx += 1
+                if frame_idx % self.config.capture.frame_stride != 0:
+                    continue
+                    
+                # Detect landmarks
+                face_landmarks = self.landmark_detector.detect_landmarks(frame)
+                if face_landmarks is None:
+                    continue
+                landmarks = self.landmark_detector.extract_landmark_points(frame, face_landmarks)
+                    
+                # Check for significant changes
+                if self.change_detector.is_significant_change(landmarks):
+                    # All stored frames share one buffer, so its shape is fixed
+                    # by the first stored frame; later frames of another shape
+                    # (e.g. after a camera resolution change) are skipped
+                    if self._frame_buffer is None or self._frame_buffer.shape[1:] != frame.shape:
+                        if num_stored > 0:
+                            continue
+                        self._frame_buffer = self._allocate_frame_buffer(frame.shape)
+                        
+                    # Analyze frame
+                    geometry_features = self.geometry_analyzer.analyze_geometry(landmarks)
+                    expression_features = self.expression_analyzer.analyze_expression(landmarks)
+                    color_features = self.color_analyzer.analyze(frame, landmarks)
+                    
+                    # Store data, copying the frame into its preallocated slot
+                    stored_frame = self._frame_buffer[num_stored]
+                    np.copyto(stored_frame, frame)
+                    self._landmark_buffer[num_stored] = landmarks
+                    num_stored += 1
+                    captured_data["metrics"]["geometry"].append(geometry_features)
+                    captured_data["metrics"]["expression"].append(expression_features)
+                    captured_data["metrics"]["color"].append(color_features)
+                    
+                    # Hand off to the visualizer thread
+                    vis_queue.put((stored_frame, landmarks))
+                    
+                    # Stop once the landmark store is full
+                    if num_stored == len(self._landmark_buffer):
+                        stop_event.set()
+        finally:
+            stop_event.set()
+            vis_queue.put(self._END_OF_STREAM)
+            
+            # Drain so the reader can always deliver its end-of-stream marker
+            while reader.is_alive():
+                try:
+                    read_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            visualizer.join()
+            
+        # Copy the filled landmark rows so later sessions can reuse the buffer;
+        # the much larger frame store is handed over and reallocated on demand
+        captured_data["landmarks"] = self._landmark_buffer[:num_stored].copy()
+        if self._frame_buffer is not None:
+            captured_data["frames"] = self._frame_buffer[:num_stored]
+            self._frame_buffer = None
+        
+        cv2.destroyAllWindows()
+        return session_id, captured_data
+        
+    def _read_frames(self, read_queue: queue.Queue, stop_event: threading.Event,
+                     deadline: float):
+        """Capture stage: read frames until the deadline or a stop request.
+        
+        Frames are dropped when the processing stage falls behind, and reading
+        stops early once the camera keeps returning no frames.
+        """
+        empty_streak = 0
+        while not stop_event.is_set() and time.time() < deadline:
             frame = self.video_capture.read_frame()
             if frame is None:
+                empty_streak += 1
+                if empty_streak > self.MAX_EMPTY_FRAMES:
+                    print("Camera stopped delivering frames, ending capture")
+                    break
                 continue
-                
-            # Detect landmarks
-            landmarks = self.landmark_detector.detect_landmarks(frame)
-            if landmarks is None:
+            empty_streak = 0
+            try:
+                read_queue.put(frame, timeout=0.1)
+            except queue.Full:
                 continue
-                
-            # Check for significant changes
-            if self.change_detector.is_significant_change(landmarks):
-                # Analyze frame
-                geometry_features = self.geometry_analyzer.analyze_geometry(landmarks)
-                expression_features = self.expression_analyzer.analyze_expression(landmarks)
-                color_features = self.color_analyzer.analyze(frame, landmarks)
-                
-                # Store data
-                captured_data["landmarks"].append(landmarks)
-                captured_data["frames"].append(frame)
-                captured_data["metrics"]["geometry"].append(geometry_features)
-                captured_data["metrics"]["expression"].append(expression_features)
-                captured_data["metrics"]["color"].append(color_features)
-                
-                # Visualize progress
-                vis_frame = self.feature_visualizer.draw_landmarks(frame, landmarks)
-                cv2.imshow("Capture Progress", vis_frame)
-                
-            if cv2.waitKey(1) & 0xFF == 27:  # ESC to exit
-                break
-                
-        cv2.destroyAllWindows()
-        return session_id, captured_data
+        read_queue.put(self._END_OF_STREAM)
+        
+    def _show_progress(self, vis_queue: queue.Queue, stop_event: threading.Event):
+        """Visualization stage: draw stored frames and watch for ESC.
         
+        If drawing fails (e.g. no display for HighGUI), capture is stopped and
+        the queue is still drained up to its end-of-stream marker so the
+        capture loop never blocks on a full queue.
+        """
+        num_received = 0
+        preview = None
+        item = None
+        try:
+            while True:
+                try:
+                    item = vis_queue.get(timeout=0.03)
+                except queue.Empty:
+                    item = ()
+                if item is self._END_OF_STREAM:
+                    break
+                    
+                if item:
+                    num_received += 1
+                if item and num_received % self.DISPLAY_STRIDE == 0:
+                    frame, landmarks = item
+                    
+                    # Stored frames must stay untouched, so draw into one reused buffer
+                    if preview is None or preview.shape != frame.shape:
+                        preview = np.empty_like(frame)
+                    self.feature_visualizer.draw_landmarks(frame, landmarks, out=preview)
+                    cv2.imshow("Capture Progress", preview)
+                    
+                if cv2.waitKey(1) & 0xFF == 27:  # ESC to exit
+                    stop_event.set()
+        finally:
+            if item is not self._END_OF_STREAM:
+                stop_event.set()
+                while vis_queue.get() is not self._END_OF_STREAM:
+                    pass
+                
     def run_depth_analysis(self, captured_data: Dict) -> Dict:
         """Run depth analysis on captured frames.
         
@@ -136,20 +308,23 @@ class BiometricPipeline:
             "meshes": []
         }
         
-        for landmarks in captured_data["landmarks"]:
-            # Generate depth map
-            depth_map = self.depth_mapper.create_depth_map(landmarks)
-            
-            # Extract depth features
-            depth_features = self.depth_extractor.calculate_depth_features(landmarks)
-            
-            # Generate 3D mesh
-            mesh = self.mesh_generator.create_3d_mesh(landmarks)
-            
-            # Store results
-            depth_results["depth_maps"].append(depth_map)
-            depth_results["depth_features"].append(depth_features)
-            depth_results["meshes"].append(mesh)
+        # Frames are independent, so spread chunks of them across worker processes
+        landmarks_stack = captured_data["landmarks"]
+        chunks = [landmarks_stack[start:start + self.DEPTH_CHUNK_SIZE]
+                  for start in range(0, len(landmarks_stack), self.DEPTH_CHUNK_SIZE)]
+        with ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            initializer=_init_depth_worker,
+            initargs=(
+                (self.config.capture.frame_width, self.config.capture.frame_height),
+                self.landmark_detector.FEATURE_INDICES
+            )
+        ) as executor:
+            # Store results in frame order
+            for depth_maps, depth_features, meshes in executor.map(_analyze_depth_chunk, chunks):
+                depth_results["depth_maps"].extend(depth_maps)
+                depth_results["depth_features"].extend(depth_features)
+                depth_results["meshes"].extend(meshes)
             
         return depth_results
         
@@ -164,27 +339,37 @@ class BiometricPipeline:
         """
         print("\nGenerating visualizations...")
         
-        # Create feature dashboard
-        feature_fig = self.feature_visualizer.create_feature_dashboard(
-            captured_data["landmarks"][-1],  # Use last frame
-            captured_data["metrics"]
-        )
-        feature_fig.write_html(f"output/visualization/{session_id}_features.html")
-        
-        # Create depth analysis dashboard
-        depth_fig = self.depth_visualizer.create_depth_analysis_dashboard(
-            depth_results["depth_maps"][-1],
-            depth_results["depth_features"][-1]
-        )
-        depth_fig.write_html(f"output/visualization/{session_id}_depth.html")
-        
-        # Create 3D mesh visualization
-        mesh = depth_results["meshes"][-1]
-        mesh_fig = self.mesh_visualizer.create_surface_plot(
-            mesh["vertices"],
-            mesh["faces"]
-        )
-        mesh_fig.write_html(f"output/visualization/{session_id}_mesh.html")
+        def write_feature_dashboard():
+            feature_fig = self.feature_visualizer.create_feature_dashboard(
+                captured_data["landmarks"][-1],  # Use last frame
+                captured_data["metrics"]
+            )
+            feature_fig.write_html(f"output/visualization/{session_id}_features.html")
+            
+        def write_depth_dashboard():
+            depth_fig = self.depth_visualizer.create_depth_analysis_dashboard(
+                depth_results["depth_maps"][-1].dequantize(),
+                depth_results["depth_features"][-1]
+            )
+            depth_fig.write_html(f"output/visualization/{session_id}_depth.html")
+            
+        def write_mesh_plot():
+            mesh = depth_results["meshes"][-1]
+            mesh_fig = self.mesh_visualizer.create_surface_plot(
+                mesh["vertices"],
+                mesh["faces"]
+            )
+            mesh_fig.write_html(f"output/visualization/{session_id}_mesh.html")
+            
+        # The three outputs are independent, so build and write them concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(write_feature_dashboard),
+                executor.submit(write_depth_dashboard),
+                executor.submit(write_mesh_plot)
+            ]
+            for future in futures:
+                future.result()
         
     def run_full_pipeline(self) -> str:
         """Run the complete biometric analysis pipeline.
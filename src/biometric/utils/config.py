@@ -13,6 +13,8 @@ class CaptureConfig:
     min_face_size: Tuple[int, int] = (30, 30)
     quality_threshold: float = 0.8
     change_threshold: float = 0.15
+    max_stored_frames: int = 300
+    frame_stride: int = 2  # analyze every Nth captured frame
 
 @dataclass
 class AnalysisConfig:
@@ -1,21 +1,10 @@
 import os
-import json
+import orjson
 import cv2
 import numpy as np
 from datetime import datetime
 import pandas as pd
 
-class NumpyJSONEncoder(json.JSONEncoder):
-    """Custom JSON encoder for NumPy types."""
-    def default(self, obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        if isinstance(obj, np.floating):
-            return float(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return super().default(obj)
-
 class BiometricDataHandler:
     """Handles storage and retrieval of biometric data."""
     
@@ -24,6 +13,7 @@ class BiometricDataHandler:
         self.base_dir = base_output_dir
         self.profiles_dir = os.path.join(base_output_dir, "profiles")
         self.temp_dir = os.path.join(base_output_dir, "temp")
+        self.index_path = os.path.join(self.profiles_dir, "index.json")
         
         # Ensure directories exist
         for dir_path in [self.profiles_dir, self.temp_dir]:
@@ -33,22 +23,97 @@ class BiometricDataHandler:
         """Generate a timestamp for file naming."""
         return datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    def _convert_to_serializable(self, data):
-        """Convert NumPy types to Python native types."""
-        if isinstance(data, dict):
-            return {k: self._convert_to_serializable(v) for k, v in data.items()}
-        elif isinstance(data, list):
-            return [self._convert_to_serializable(item) for item in data]
-        elif isinstance(data, np.ndarray):
-            return data.tolist()
-        elif isinstance(data, (np.integer, np.floating)):
-            return float(data)
+    def _load_index(self):
+        """Load the profile index, rebuilding it from profile files if missing."""
+        if os.path.exists(self.index_path):
+            return self._load_json(self.index_path)
+        
+        index = {}
+        with os.scandir(self.profiles_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith("profile_") and entry.name.endswith(".json"):
+                    profile = self._load_json(entry.path)
+                    session_id = entry.name.replace("profile_", "").replace(".json", "")
+                    index[session_id] = self._index_entry(session_id, profile)
+        self._write_index(index)
+        return index
+
+    def _write_index(self, index):
+        """Write the profile index."""
+        self._dump_json(index, self.index_path)
+
+    @staticmethod
+    def _index_entry(session_id, profile):
+        """Summary of a profile as listed by list_profiles."""
+        return {
+            "session_id": session_id,
+            "timestamp": profile.get("timestamp", "Unknown"),
+            "frame_count": profile.get("metadata", {}).get("frame_count", 0),
+            "quality_score": profile.get("metadata", {}).get("quality_score", 0)
+        }
+
+    @staticmethod
+    def _serialize_default(obj):
+        """Convert values orjson does not handle natively."""
+        if isinstance(obj, np.ndarray):
+            # Non-contiguous or unsupported dtypes
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            return obj.item()
+        raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+    def _dump_json(self, data, path):
+        """Write data as indented JSON, encoding NumPy values natively."""
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(
+                data,
+                default=self._serialize_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+            ))
+
+    @staticmethod
+    def _load_json(path):
+        """Read a JSON file."""
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+
+    def _extract_arrays(self, data, prefix, arrays):
+        """Move ndarray leaves of nested dicts into arrays, keyed by dotted path.
+        
+        Lists made only of equally shaped arrays are stacked into one array.
+        Returns the data with those leaves removed.
+        """
+        remaining = {}
+        for k, v in data.items():
+            key = f"{prefix}.{k}" if prefix else k
+            if (isinstance(v, list) and v
+                    and all(isinstance(item, np.ndarray) for item in v)
+                    and len({item.shape for item in v}) == 1):
+                v = np.stack(v)
+            if isinstance(v, np.ndarray):
+                arrays[key] = v
+            elif isinstance(v, dict):
+                remaining[k] = self._extract_arrays(v, key, arrays)
+            else:
+                remaining[k] = v
+        return remaining
+
+    @staticmethod
+    def _restore_arrays(data, arrays):
+        """Insert arrays back into nested dicts at their dotted paths."""
+        for key, value in arrays.items():
+            *parents, leaf = key.split(".")
+            node = data
+            for parent in parents:
+                node = node.setdefault(parent, {})
+            node[leaf] = value
         return data
 
     def save_biometric_profile(self, session_id, profile_data):
         """Save complete biometric profile including all essential data."""
         try:
             profile_path = os.path.join(self.profiles_dir, f"profile_{session_id}.json")
+            arrays_path = os.path.join(self.profiles_dir, f"profile_{session_id}.npz")
             
             # Structure the profile data
             profile = {
@@ -67,10 +132,22 @@ class BiometricDataHandler:
                 }
             }
             
-            # Save the profile
-            serializable_data = self._convert_to_serializable(profile)
-            with open(profile_path, 'w') as f:
-                json.dump(serializable_data, f, indent=4, cls=NumpyJSONEncoder)
+            # Save bulky arrays in binary form and the remaining metadata as JSON
+            arrays = {}
+            profile["biometric_data"] = self._extract_arrays(
+                profile["biometric_data"], "", arrays
+            )
+            if arrays:
+                np.savez_compressed(arrays_path, **arrays)
+            elif os.path.exists(arrays_path):
+                os.remove(arrays_path)
+            
+            self._dump_json(profile, profile_path)
+            
+            # Keep the listing index in step with the saved profile
+            index = self._load_index()
+            index[str(session_id)] = self._index_entry(str(session_id), profile)
+            self._write_index(index)
             
             return profile_path
         except Exception as e:
@@ -84,8 +161,16 @@ class BiometricDataHandler:
             if not os.path.exists(profile_path):
                 return None
             
-            with open(profile_path, 'r') as f:
-                return json.load(f)
+            profile = self._load_json(profile_path)
+            
+            arrays_path = os.path.join(self.profiles_dir, f"profile_{session_id}.npz")
+            if os.path.exists(arrays_path):
+                with np.load(arrays_path) as arrays:
+                    self._restore_arrays(
+                        profile.setdefault("biometric_data", {}),
+                        {key: arrays[key] for key in arrays.files}
+                    )
+            return profile
         except Exception as e:
             print(f"Error loading biometric profile: {str(e)}")
             return None
@@ -94,9 +179,7 @@ class BiometricDataHandler:
         """Save temporary data during analysis."""
         try:
             temp_path = os.path.join(self.temp_dir, f"{data_type}_{session_id}.json")
-            serializable_data = self._convert_to_serializable(data)
-            with open(temp_path, 'w') as f:
-                json.dump(serializable_data, f, indent=4, cls=NumpyJSONEncoder)
+            self._dump_json(data, temp_path)
             return temp_path
         except Exception as e:
             print(f"Error saving temporary data: {str(e)}")
@@ -105,15 +188,11 @@ class BiometricDataHandler:
     def clean_temp_data(self, session_id=None):
         """Clean temporary data files."""
         try:
-            if session_id:
-                # Clean specific session
-                for file in os.listdir(self.temp_dir):
-                    if session_id in file:
-                        os.remove(os.path.join(self.temp_dir, file))
-            else:
-                # Clean all temp files
-                for file in os.listdir(self.temp_dir):
-                    os.remove(os.path.join(self.temp_dir, file))
+            # Clean a specific session's files, or all temp files
+            with os.scandir(self.temp_dir) as entries:
+                for entry in entries:
+                    if not session_id or session_id in entry.name:
+                        os.unlink(entry.path)
         except Exception as e:
             print(f"Error cleaning temporary data: {str(e)}")
             raise
@@ -121,20 +200,7 @@ class BiometricDataHandler:
     def list_profiles(self):
         """List all available biometric profiles."""
         try:
-            profiles = []
-            for file in os.listdir(self.profiles_dir):
-                if file.startswith("profile_") and file.endswith(".json"):
-                    session_id = file.replace("profile_", "").replace(".json", "")
-                    profile_path = os.path.join(self.profiles_dir, file)
-                    with open(profile_path, 'r') as f:
-                        profile = json.load(f)
-                    profiles.append({
-                        "session_id": session_id,
-                        "timestamp": profile.get("timestamp", "Unknown"),
-                        "frame_count": profile.get("metadata", {}).get("frame_count", 0),
-                        "quality_score": profile.get("metadata", {}).get("quality_score", 0)
-                    })
-            return profiles
+            return list(self._load_index().values())
         except Exception as e:
             print(f"Error listing profiles: {str(e)}")
             return []
@@ -143,6 +209,15 @@ class BiometricDataHandler:
         """Delete a specific biometric profile."""
         try:
             profile_path = os.path.join(self.profiles_dir, f"profile_{session_id}.json")
+            arrays_path = os.path.join(self.profiles_dir, f"profile_{session_id}.npz")
+            if os.path.exists(arrays_path):
+                os.remove(arrays_path)
+            
+            # Drop the index entry even if the profile file is already gone
+            index = self._load_index()
+            if index.pop(str(session_id), None) is not None:
+                self._write_index(index)
+            
             if os.path.exists(profile_path):
                 os.remove(profile_path)
                 return True
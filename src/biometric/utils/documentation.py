@@ -1,23 +1,36 @@
 """Documentation storage and retrieval system using ChromaDB and RAG."""
 import os
 import json
+import hashlib
+import functools
+import queue
+import threading
 from typing import List, Dict, Optional
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
-from langchain.chains import RetrievalQA
-from langchain.llms import OpenAI
-from langchain.prompts import PromptTemplate
+
+# chromadb, sentence_transformers and langchain pull in torch and friends, so
+# they are imported where first needed instead of at module import
+
+@functools.lru_cache(maxsize=None)
+def _get_embedder(model_name: str = 'all-MiniLM-L6-v2'):
+    """Load a sentence embedding model once per process."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
 
 class DocumentationSystem:
     """Manages project documentation storage and retrieval using ChromaDB."""
     
+    # Maximum number of documents the writer thread sends per collection.add
+    WRITE_BATCH_SIZE = 64
+    
     def __init__(self, persist_dir: str = "data/documentation"):
         """Initialize the documentation system.
         
         Args:
             persist_dir: Directory to store ChromaDB data
         """
+        import chromadb
+        from chromadb.config import Settings
+        
         os.makedirs(persist_dir, exist_ok=True)
         
         # Initialize ChromaDB client
@@ -26,14 +39,33 @@ class DocumentationSystem:
             persist_directory=persist_dir
         ))
         
-        # Initialize embedding model
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        # Embeddings keyed by content hash, persisted next to the ChromaDB data
+        self.embedding_cache_path = os.path.join(persist_dir, "embedding_cache.json")
+        self._embedding_cache = {}
+        if os.path.exists(self.embedding_cache_path):
+            with open(self.embedding_cache_path, 'r') as f:
+                self._embedding_cache = json.load(f)
         
         # Initialize collection
         self.collection = self.client.get_or_create_collection("project_docs")
         
-        # Initialize RAG components
-        self.qa_prompt = PromptTemplate(
+        # Collection writes happen on a background thread fed by add_document
+        self._write_queue = queue.Queue()
+        self._write_error = None
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+        
+    @property
+    def embedder(self):
+        """Sentence embedding model, loaded on first use."""
+        return _get_embedder()
+        
+    @functools.cached_property
+    def qa_prompt(self):
+        """Prompt template for RAG responses, built on first use."""
+        from langchain.prompts import PromptTemplate
+        
+        return PromptTemplate(
             template="""You are a helpful assistant for the Biometric Analysis Project. 
             Use the following context to answer the question at the end. If you don't know 
             the answer, say you don't know, don't try to make up an answer.
@@ -45,6 +77,32 @@ class DocumentationSystem:
             input_variables=["context", "question"]
         )
         
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        """Hash document content for the embedding cache."""
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+        
+    def _embed_documents(self, contents: List[str]) -> List[List[float]]:
+        """Embed documents, encoding only content not already in the cache.
+        
+        Args:
+            contents: Document contents
+            
+        Returns:
+            Embeddings in the same order as contents
+        """
+        hashes = [self._content_hash(content) for content in contents]
+        missing = {h: content for h, content in zip(hashes, contents)
+                   if h not in self._embedding_cache}
+        
+        if missing:
+            # Encode uncached documents in batches
+            embeddings = self.embedder.encode(list(missing.values()), batch_size=32)
+            for h, embedding in zip(missing, embeddings):
+                self._embedding_cache[h] = embedding.tolist()
+                
+        return [self._embedding_cache[h] for h in hashes]
+        
     def add_document(self, title: str, content: str, metadata: Optional[Dict] = None):
         """Add a document to the knowledge base.
         
@@ -53,16 +111,67 @@ class DocumentationSystem:
             content: Content of the document
             metadata: Optional metadata dictionary
         """
-        # Generate embedding
-        embedding = self.embedder.encode(content).tolist()
-        
-        # Add to collection
-        self.collection.add(
-            documents=[content],
-            metadatas=[metadata or {}],
-            ids=[title],
-            embeddings=[embedding]
-        )
+        self.add_documents([title], [content], [metadata])
+        
+    def add_documents(self, titles: List[str], contents: List[str],
+                      metadatas: Optional[List[Optional[Dict]]] = None):
+        """Add several documents to the knowledge base at once.
+        
+        Args:
+            titles: Titles of the documents
+            contents: Contents of the documents
+            metadatas: Optional metadata dictionaries, one per document
+        """
+        if metadatas is None:
+            metadatas = [None] * len(contents)
+            
+        # Generate embeddings
+        embeddings = self._embed_documents(contents)
+        
+        # Hand off to the writer thread
+        for title, content, metadata, embedding in zip(titles, contents, metadatas, embeddings):
+            self._write_queue.put((title, content, metadata or {}, embedding))
+            
+    def _writer_loop(self):
+        """Drain queued documents into the collection in batches."""
+        while True:
+            batch = [self._write_queue.get()]
+            while len(batch) < self.WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+                    
+            try:
+                titles, contents, metadatas, embeddings = zip(*batch)
+                self.collection.add(
+                    documents=list(contents),
+                    metadatas=list(metadatas),
+                    ids=list(titles),
+                    embeddings=list(embeddings)
+                )
+                # Persist once the backlog is drained rather than per batch
+                if self._write_queue.empty():
+                    self.client.persist()
+            except Exception as e:
+                # Keep the first failure for flush() to raise to the caller
+                if self._write_error is None:
+                    self._write_error = e
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+                    
+    def flush(self):
+        """Block until every queued document has been written and persisted.
+        
+        Raises:
+            Exception: The first error raised by a background write since the
+                last flush, meaning some queued documents were not stored
+        """
+        self._write_queue.join()
+        error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
         
     def query_documents(self, query: str, n_results: int = 3) -> List[Dict]:
         """Query the documentation system.
@@ -74,25 +183,44 @@ class DocumentationSystem:
         Returns:
             List of matching documents with metadata
         """
-        # Generate query embedding
-        query_embedding = self.embedder.encode(query).tolist()
+        return self.query_documents_batch([query], n_results)[0]
         
-        # Query collection
+    def query_documents_batch(self, queries: List[str], n_results: int = 3) -> List[List[Dict]]:
+        """Query the documentation system with several queries at once.
+        
+        All queries are embedded in one encoder pass and sent in one
+        collection query.
+        
+        Args:
+            queries: Search queries
+            n_results: Number of results to return per query
+            
+        Returns:
+            List of matching documents with metadata for each query
+        """
+        # Generate query embeddings
+        query_embeddings = self.embedder.encode(queries, batch_size=32, convert_to_numpy=True)
+        
+        # Query collection, including documents still queued for writing
+        self.flush()
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embeddings.tolist(),
             n_results=n_results
         )
         
         return [
-            {
-                "document": doc,
-                "metadata": meta,
-                "score": score
-            }
-            for doc, meta, score in zip(
-                results["documents"][0],
-                results["metadatas"][0],
-                results["distances"][0]
+            [
+                {
+                    "document": doc,
+                    "metadata": meta,
+                    "score": score
+                }
+                for doc, meta, score in zip(documents, metadatas, distances)
+            ]
+            for documents, metadatas, distances in zip(
+                results["documents"],
+                results["metadatas"],
+                results["distances"]
             )
         ]
         
@@ -111,6 +239,9 @@ class DocumentationSystem:
             results = self.query_documents(question)
             context = "\n".join([r["document"] for r in results])
             
+        from langchain.chains import RetrievalQA
+        from langchain.llms import OpenAI
+        
         # Initialize QA chain
         qa_chain = RetrievalQA.from_chain_type(
             llm=OpenAI(temperature=0),
@@ -129,4 +260,7 @@ class DocumentationSystem:
         
     def save(self):
         """Persist the documentation database."""
+        self.flush()
         self.client.persist()
+        with open(self.embedding_cache_path, 'w') as f:
+            json.dump(self._embedding_cache, f)
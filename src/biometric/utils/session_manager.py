@@ -3,6 +3,18 @@ import shutil
 from datetime import datetime
 import json
 import glob
+import numpy as np
+
+from .data_handler import BiometricDataHandler
+
+# Row layout of the session listing, sorted in bulk before converting to dicts
+_SESSION_DTYPE = np.dtype([
+    ("session_id", "U32"),
+    ("timestamp", "U32"),
+    ("frame_count", "i4"),
+    ("quality_score", "f8"),
+    ("capture_duration", "f8")
+])
 
 class SessionManager:
     """Manages biometric capture sessions and output directory cleanup."""
@@ -11,7 +23,10 @@ class SessionManager:
         self.output_dir = output_dir
         self.session_id = None
         self.session_start_time = None
+        self._sessions_cache = None
+        self._sessions_cache_key = None
         self._create_directory_structure()
+        self.data_handler = BiometricDataHandler(output_dir)
         
     def _create_directory_structure(self):
         """Create the required directory structure."""
@@ -24,56 +39,87 @@ class SessionManager:
             os.makedirs(directory, exist_ok=True)
     
     def list_sessions(self):
-        """List all existing sessions with their profiles."""
+        """List all existing sessions with their profiles.
+        
+        The listing is cached until a profile file is added, removed or
+        rewritten.
+        """
         profiles_dir = os.path.join(self.output_dir, "profiles")
-        session_details = []
         
         try:
-            for file in os.listdir(profiles_dir):
-                if file.startswith("profile_") and file.endswith(".json"):
-                    profile_path = os.path.join(profiles_dir, file)
-                    try:
-                        with open(profile_path, 'r') as f:
-                            profile = json.load(f)
-                            
-                        session_details.append({
-                            "session_id": profile.get("session_id"),
-                            "timestamp": profile.get("timestamp"),
-                            "frame_count": profile.get("metadata", {}).get("frame_count", 0),
-                            "quality_score": profile.get("metadata", {}).get("quality_score", 0),
-                            "capture_duration": profile.get("metadata", {}).get("capture_duration", 0)
-                        })
-                    except Exception as e:
-                        print(f"Error reading profile {file}: {e}")
-                        continue
+            with os.scandir(profiles_dir) as entries:
+                profile_entries = [
+                    entry for entry in entries
+                    if entry.name.startswith("profile_") and entry.name.endswith(".json")
+                ]
+            
+            # Key on each profile's name and mtime; the directory mtime alone
+            # misses profiles re-saved in place
+            cache_key = frozenset(
+                (entry.name, entry.stat().st_mtime_ns) for entry in profile_entries
+            )
+            if self._sessions_cache is not None and cache_key == self._sessions_cache_key:
+                return list(self._sessions_cache)
+            
+            sessions = np.zeros(len(profile_entries), dtype=_SESSION_DTYPE)
+            count = 0
+            for entry in profile_entries:
+                try:
+                    with open(entry.path, 'r') as f:
+                        profile = json.load(f)
+                        
+                    metadata = profile.get("metadata", {})
+                    sessions[count] = (
+                        profile.get("session_id") or "",
+                        profile.get("timestamp") or "",
+                        metadata.get("frame_count", 0),
+                        metadata.get("quality_score", 0),
+                        metadata.get("capture_duration", 0)
+                    )
+                    count += 1
+                except Exception as e:
+                    print(f"Error reading profile {entry.name}: {e}")
+                    continue
             
             # Sort by timestamp (newest first)
-            return sorted(session_details, key=lambda x: x["timestamp"], reverse=True)
+            sessions = np.sort(sessions[:count], order="timestamp")[::-1]
+            self._sessions_cache_key = cache_key
+            self._sessions_cache = [
+                {
+                    "session_id": str(row["session_id"]) or None,
+                    "timestamp": str(row["timestamp"]) or None,
+                    "frame_count": int(row["frame_count"]),
+                    "quality_score": float(row["quality_score"]),
+                    "capture_duration": float(row["capture_duration"])
+                }
+                for row in sessions
+            ]
+            return list(self._sessions_cache)
         except Exception as e:
             print(f"Error listing sessions: {e}")
             return []
     
     def clean_session(self, session_id):
         """Remove a specific session's profile and any temporary files."""
+        self._sessions_cache = None
         files_removed = 0
         
         try:
-            # Remove profile
-            profile_path = os.path.join(self.output_dir, "profiles", f"profile_{session_id}.json")
-            if os.path.exists(profile_path):
-                os.remove(profile_path)
+            # Remove profile, including its array file
+            if self.data_handler.delete_profile(session_id):
                 files_removed += 1
             
             # Remove any temporary files
             temp_dir = os.path.join(self.output_dir, "temp")
-            for file in os.listdir(temp_dir):
-                if session_id in file:
-                    file_path = os.path.join(temp_dir, file)
+            with os.scandir(temp_dir) as entries:
+                for entry in entries:
+                    if session_id not in entry.name:
+                        continue
                     try:
-                        os.remove(file_path)
+                        os.unlink(entry.path)
                         files_removed += 1
                     except Exception as e:
-                        print(f"Error removing temporary file {file}: {e}")
+                        print(f"Error removing temporary file {entry.name}: {e}")
             
             return files_removed
         except Exception as e:
@@ -82,22 +128,30 @@ class SessionManager:
     
     def clean_all_sessions(self):
         """Remove all profiles and temporary files."""
+        self._sessions_cache = None
         try:
+            # Remove the profile index first, so that if any profile file
+            # survives the index is rebuilt from what is actually on disk
+            if os.path.exists(self.data_handler.index_path):
+                os.unlink(self.data_handler.index_path)
+            
             # Remove all files in profiles directory
             profiles_dir = os.path.join(self.output_dir, "profiles")
-            for file in os.listdir(profiles_dir):
-                try:
-                    os.remove(os.path.join(profiles_dir, file))
-                except Exception as e:
-                    print(f"Error removing profile {file}: {e}")
+            with os.scandir(profiles_dir) as entries:
+                for entry in entries:
+                    try:
+                        os.unlink(entry.path)
+                    except Exception as e:
+                        print(f"Error removing profile {entry.name}: {e}")
             
             # Clean temporary directory
             temp_dir = os.path.join(self.output_dir, "temp")
-            for file in os.listdir(temp_dir):
-                try:
-                    os.remove(os.path.join(temp_dir, file))
-                except Exception as e:
-                    print(f"Error removing temporary file {file}: {e}")
+            with os.scandir(temp_dir) as entries:
+                for entry in entries:
+                    try:
+                        os.unlink(entry.path)
+                    except Exception as e:
+                        print(f"Error removing temporary file {entry.name}: {e}")
             
             return True
         except Exception as e:
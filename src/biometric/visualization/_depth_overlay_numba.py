@@ -0,0 +1,83 @@
+"""Numba-compiled kernels for blending a colored depth map onto a frame.
+
+Both kernels take an optional mask; when it is None, every non-NaN depth is
+overlaid, so no HxW validity array has to be built. fastmath is left off
+because depth maps carry NaN outside the face.
+"""
+import numba
+import numpy as np
+
+@numba.njit(cache=True, parallel=True)
+def depth_range(depth, mask):
+    """Find the depth range over the overlaid pixels in one pass.
+    
+    Each row is reduced independently, then the per-row results are combined.
+    NaN depths never win a comparison, so they are skipped.
+    
+    Args:
+        depth: HxW array of depth values
+        mask: HxW boolean array of pixels to consider, or None for all
+        
+    Returns:
+        Tuple of (d_min, d_max); d_min > d_max when no pixel is valid
+    """
+    height, width = depth.shape
+    row_min = np.empty(height)
+    row_max = np.empty(height)
+    for y in numba.prange(height):
+        lo = np.inf
+        hi = -np.inf
+        for x in range(width):
+            if mask is not None and not mask[y, x]:
+                continue
+            d = depth[y, x]
+            if d < lo:
+                lo = d
+            if d > hi:
+                hi = d
+        row_min[y] = lo
+        row_max[y] = hi
+    return row_min.min(), row_max.max()
+
+@numba.njit(cache=True, parallel=True)
+def depth_overlay(frame, depth, mask, d_min, d_max, lut, alpha, out):
+    """Normalize, colorize and alpha-blend a depth map in a single pass.
+    
+    Overlaid pixels are scaled to 0-255 between d_min and d_max, looked up
+    in the colormap table and blended with the frame; other pixels are
+    copied unchanged.
+    
+    Args:
+        frame: HxWx3 uint8 input frame
+        depth: HxW array of depth values
+        mask: HxW boolean array of pixels to overlay, or None for all
+            non-NaN depths
+        d_min: Depth mapped to the first colormap entry
+        d_max: Depth mapped to the last colormap entry
+        lut: 256x3 uint8 colormap table
+        alpha: Weight of the depth colors in the blend
+        out: HxWx3 uint8 array receiving the overlay
+    """
+    height, width = depth.shape
+    scale = 255.0 / (d_max - d_min) if d_max > d_min else 0.0
+    for y in numba.prange(height):
+        for x in range(width):
+            if mask is None:
+                overlaid = not np.isnan(depth[y, x])
+            else:
+                overlaid = mask[y, x]
+            if not overlaid:
+                for c in range(3):
+                    out[y, x, c] = frame[y, x, c]
+                continue
+            
+            level = (depth[y, x] - d_min) * scale
+            if not level >= 0.0:
+                level = 0.0
+            elif level > 255.0:
+                level = 255.0
+            d = int(level)
+            
+            for c in range(3):
+                value = (1.0 - alpha) * frame[y, x, c] + alpha * lut[d, c] + 0.5
+                out[y, x, c] = min(int(value), 255)
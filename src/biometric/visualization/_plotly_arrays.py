@@ -0,0 +1,15 @@
+"""Array conversions for data handed to Plotly traces.
+
+Plotly encodes contiguous numeric arrays as typed binary buffers, so trace
+data is cast to float32/int32 C-contiguous arrays to halve the payload of
+float64 inputs.
+"""
+import numpy as np
+
+def as_f32(a: np.ndarray) -> np.ndarray:
+    """C-contiguous float32 view or copy of an array."""
+    return np.ascontiguousarray(a, dtype=np.float32)
+
+def as_i32(a: np.ndarray) -> np.ndarray:
+    """C-contiguous int32 view or copy of an array."""
+    return np.ascontiguousarray(a, dtype=np.int32)
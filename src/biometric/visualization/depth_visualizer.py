@@ -1,10 +1,16 @@
 """Visualize depth maps and 3D facial features."""
 import cv2
 import numpy as np
-import plotly.graph_objects as go
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 from dataclasses import dataclass
 
+from ._depth_overlay_numba import depth_overlay, depth_range
+from ._plotly_arrays import as_f32, as_i32
+
+# plotly is slow to import, so methods import it when building a figure
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
 @dataclass
 class DepthVisualizationConfig:
     """Configuration for depth visualization."""
@@ -13,6 +19,7 @@ class DepthVisualizationConfig:
     point_size: int = 2
     mesh_opacity: float = 0.7
     surface_colorscale: str = 'Viridis'
+    max_cones: int = 2000
 
 class DepthVisualizer:
     """Visualizes depth maps and 3D facial features."""
@@ -24,15 +31,33 @@ class DepthVisualizer:
             config: Optional visualization configuration
         """
         self.config = config or DepthVisualizationConfig()
+        self._cmap_lut = None
+        self._cmap_lut_colormap = None
+    
+    def _get_colormap_lut(self) -> np.ndarray:
+        """Get the 256x3 BGR table for the configured colormap.
+        
+        The table is rebuilt only when config.colormap changes.
+        """
+        if self._cmap_lut is None or self._cmap_lut_colormap != self.config.colormap:
+            self._cmap_lut = cv2.applyColorMap(
+                np.arange(256, dtype=np.uint8).reshape(256, 1),
+                self.config.colormap
+            ).reshape(256, 3)
+            self._cmap_lut_colormap = self.config.colormap
+        return self._cmap_lut
     
     def create_depth_overlay(self, frame: np.ndarray, depth_map: np.ndarray,
-                           mask: Optional[np.ndarray] = None) -> np.ndarray:
+                           mask: Optional[np.ndarray] = None,
+                           out: Optional[np.ndarray] = None) -> np.ndarray:
         """Create a colored depth overlay on the frame.
         
         Args:
             frame: Input frame
             depth_map: Depth map array
             mask: Optional mask for valid depth values
+            out: Optional buffer shaped like frame to write the overlay into;
+                may be frame itself to draw in place
             
         Returns:
             Frame with depth overlay
@@ -41,40 +66,44 @@ class DepthVisualizer:
         if depth_map.shape[:2] != frame.shape[:2]:
             depth_map = cv2.resize(depth_map, (frame.shape[1], frame.shape[0]))
         
-        # Normalize depth values
-        valid_mask = ~np.isnan(depth_map) if mask is None else mask
-        if np.any(valid_mask):
-            depth_norm = np.zeros_like(depth_map)
-            depth_norm[valid_mask] = cv2.normalize(
-                depth_map[valid_mask],
-                None,
-                0,
-                255,
-                cv2.NORM_MINMAX
-            )
-            
-            # Apply colormap
-            depth_colored = cv2.applyColorMap(
-                depth_norm.astype(np.uint8),
-                self.config.colormap
-            )
-            
-            # Create overlay
-            overlay = frame.copy()
-            overlay[valid_mask] = cv2.addWeighted(
-                frame[valid_mask],
-                1 - self.config.alpha,
-                depth_colored[valid_mask],
-                self.config.alpha,
-                0
-            )
+        # Depth range over the overlaid pixels; without a mask, NaN marks
+        # the pixels to leave alone, so no validity array is built
+        if mask is not None:
+            mask = np.asarray(mask, dtype=bool)
+        d_min, d_max = depth_range(depth_map, mask)
+        if d_min <= d_max:
+            # Normalize, apply colormap and blend in one pass
+            overlay = np.empty_like(frame) if out is None else out
+            depth_overlay(frame, depth_map, mask, d_min, d_max,
+                          self._get_colormap_lut(), self.config.alpha, overlay)
             
             return overlay
         
+        if out is not None:
+            np.copyto(out, frame)
+            return out
         return frame
     
+    @staticmethod
+    def _layout(title: str, z_title: str = 'Z', **kwargs) -> Dict:
+        """Build a 3D scene layout with titled axes.
+        
+        Figures are created unvalidated, so titles use the full {'text': ...}
+        form rather than Plotly's shorthand.
+        """
+        return dict(
+            title=dict(text=title),
+            scene=dict(
+                aspectmode='data',
+                xaxis=dict(title=dict(text='X')),
+                yaxis=dict(title=dict(text='Y')),
+                zaxis=dict(title=dict(text=z_title))
+            ),
+            **kwargs
+        )
+    
     def create_3d_mesh_plot(self, vertices: np.ndarray, faces: np.ndarray,
-                           values: Optional[np.ndarray] = None) -> go.Figure:
+                           values: Optional[np.ndarray] = None) -> 'go.Figure':
         """Create an interactive 3D mesh visualization.
         
         Args:
@@ -85,37 +114,32 @@ class DepthVisualizer:
         Returns:
             Plotly figure object
         """
-        fig = go.Figure()
-        
-        # Add mesh
-        fig.add_trace(go.Mesh3d(
-            x=vertices[:, 0],
-            y=vertices[:, 1],
-            z=vertices[:, 2],
-            i=faces[:, 0],
-            j=faces[:, 1],
-            k=faces[:, 2],
+        import plotly.graph_objects as go
+        
+        xyz = as_f32(vertices.T)
+        ijk = as_i32(faces.T)
+        
+        # Traces and layout are plain dicts built from our own arrays and
+        # config, so the figure is assembled once without validation
+        mesh = dict(
+            type='mesh3d',
+            x=xyz[0],
+            y=xyz[1],
+            z=xyz[2],
+            i=ijk[0],
+            j=ijk[1],
+            k=ijk[2],
             opacity=self.config.mesh_opacity,
             colorscale=self.config.surface_colorscale,
-            intensity=values if values is not None else vertices[:, 2],
+            intensity=as_f32(values) if values is not None else xyz[2],
             showscale=True
-        ))
-        
-        # Update layout
-        fig.update_layout(
-            scene=dict(
-                aspectmode='data',
-                xaxis_title='X',
-                yaxis_title='Y',
-                zaxis_title='Z'
-            ),
-            title='3D Facial Mesh'
         )
         
-        return fig
+        return go.Figure(data=[mesh], layout=self._layout('3D Facial Mesh'),
+                         _validate=False)
     
     def create_depth_analysis_dashboard(self, depth_map: np.ndarray,
-                                      metrics: Dict[str, float]) -> go.Figure:
+                                      metrics: Dict[str, float]) -> 'go.Figure':
         """Create an interactive dashboard for depth analysis.
         
         Args:
@@ -125,16 +149,18 @@ class DepthVisualizer:
         Returns:
             Plotly figure object
         """
-        fig = go.Figure()
+        import plotly.graph_objects as go
+        
+        traces = []
         
         # Add depth surface plot
         valid_mask = ~np.isnan(depth_map)
         if np.any(valid_mask):
-            y, x = np.mgrid[:depth_map.shape[0], :depth_map.shape[1]]
-            
-            fig.add_trace(go.Surface(
-                x=x,
-                y=y,
+            # Surface accepts 1D axes, so no full coordinate grids are needed
+            traces.append(dict(
+                type='surface',
+                x=np.arange(depth_map.shape[1]),
+                y=np.arange(depth_map.shape[0]),
                 z=depth_map,
                 colorscale=self.config.surface_colorscale,
                 showscale=True,
@@ -142,62 +168,55 @@ class DepthVisualizer:
             ))
         
         # Add metrics subplot
-        fig.add_trace(go.Bar(
+        traces.append(dict(
+            type='bar',
             x=list(metrics.keys()),
             y=list(metrics.values()),
             name='Depth Metrics'
         ))
         
-        # Update layout
-        fig.update_layout(
-            title='Depth Analysis Dashboard',
-            scene=dict(
-                aspectmode='data',
-                xaxis_title='X',
-                yaxis_title='Y',
-                zaxis_title='Depth'
-            ),
-            height=800,
-            showlegend=True
-        )
-        
-        return fig
+        layout = self._layout('Depth Analysis Dashboard', z_title='Depth',
+                              height=800, showlegend=True)
+        return go.Figure(data=traces, layout=layout, _validate=False)
     
     def visualize_vector_field(self, positions: np.ndarray,
-                             vectors: np.ndarray) -> go.Figure:
+                             vectors: np.ndarray) -> 'go.Figure':
         """Create an interactive visualization of the surface normal vector field.
         
         Args:
-            positions: Nx2 array of vector positions
-            vectors: Nx3 array of vector components
+            positions: Nx2 array of vector positions, or a (rows, cols, 2)
+                grid as returned by MeshGenerator.create_vector_field
+            vectors: Nx3 array of vector components, or a matching
+                (rows, cols, 3) grid
             
         Returns:
             Plotly figure object
         """
-        fig = go.Figure()
-        
-        # Add vector field using cone plot
-        fig.add_trace(go.Cone(
-            x=positions[:, 0].flatten(),
-            y=positions[:, 1].flatten(),
-            z=np.zeros_like(positions[:, 0].flatten()),
-            u=vectors[:, 0].flatten(),
-            v=vectors[:, 1].flatten(),
-            w=vectors[:, 2].flatten(),
+        import plotly.graph_objects as go
+        
+        # Flatten grid fields to one row per vector
+        positions = positions.reshape(-1, positions.shape[-1])
+        vectors = vectors.reshape(-1, 3)
+        
+        # Evenly subsample dense fields to keep the cone trace bounded
+        num_vectors = positions.shape[0]
+        if num_vectors > self.config.max_cones:
+            idx = np.linspace(0, num_vectors - 1, self.config.max_cones).astype(np.intp)
+            positions = positions[idx]
+            vectors = vectors[idx]
+        
+        # Vector field as a cone plot
+        cones = dict(
+            type='cone',
+            x=positions[:, 0],
+            y=positions[:, 1],
+            z=np.broadcast_to(np.float32(0.0), (len(positions),)),
+            u=vectors[:, 0],
+            v=vectors[:, 1],
+            w=vectors[:, 2],
             colorscale=self.config.surface_colorscale,
             showscale=True
-        ))
-        
-        # Update layout
-        fig.update_layout(
-            title='Surface Normal Vector Field',
-            scene=dict(
-                aspectmode='data',
-                xaxis_title='X',
-                yaxis_title='Y',
-                zaxis_title='Z'
-            ),
-            height=600
         )
         
-        return fig
+        layout = self._layout('Surface Normal Vector Field', height=600)
+        return go.Figure(data=[cones], layout=layout, _validate=False)
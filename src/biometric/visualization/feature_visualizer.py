@@ -1,10 +1,15 @@
 """Visualize facial features and analysis results."""
 import cv2
 import numpy as np
-from typing import Dict, List, Tuple, Optional
-import plotly.graph_objects as go
+from typing import Dict, List, Tuple, Optional, Sequence, TYPE_CHECKING
 from dataclasses import dataclass
 
+from ._plotly_arrays import as_f32
+
+# plotly is slow to import, so methods import it when building a figure
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
 @dataclass
 class VisualizationConfig:
     """Configuration for feature visualization."""
@@ -25,51 +30,75 @@ class FeatureVisualizer:
             config: Optional visualization configuration
         """
         self.config = config or VisualizationConfig()
+    
+    @staticmethod
+    def _output_frame(frame: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+        """Get the frame to draw on: a copy of frame, or frame copied into out."""
+        if out is None:
+            return frame.copy()
+        if out is not frame:
+            np.copyto(out, frame)
+        return out
         
     def draw_landmarks(self, frame: np.ndarray, landmarks: np.ndarray,
-                      connections: Optional[List[Tuple[int, int]]] = None) -> np.ndarray:
+                      connections: Optional[List[Sequence[int]]] = None,
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
         """Draw facial landmarks and connections on frame.
         
         Args:
             frame: Input frame
             landmarks: Nx3 array of landmark coordinates
-            connections: Optional list of landmark index pairs to connect
+            connections: Optional list of landmark index pairs to connect, or
+                of longer index paths drawn as open polylines
+            out: Optional buffer shaped like frame to draw into; may be
+                frame itself to draw in place
             
         Returns:
             Frame with landmarks drawn
         """
-        vis_frame = frame.copy()
+        vis_frame = self._output_frame(frame, out)
+        pts = landmarks[:, :2].astype(np.int32)
         
-        # Draw connections
+        # Draw connections in a single polylines call
         if connections:
-            for start_idx, end_idx in connections:
-                start_point = tuple(landmarks[start_idx][:2].astype(int))
-                end_point = tuple(landmarks[end_idx][:2].astype(int))
-                cv2.line(vis_frame, start_point, end_point,
-                        self.config.connection_color,
-                        self.config.line_thickness)
+            try:
+                paths = pts[np.asarray(connections, dtype=np.intp)]
+            except ValueError:
+                # Index paths of differing lengths
+                paths = [pts[np.asarray(path, dtype=np.intp)] for path in connections]
+            cv2.polylines(vis_frame, paths, False,
+                          self.config.connection_color,
+                          self.config.line_thickness)
         
         # Draw landmarks
-        for point in landmarks:
-            point_2d = tuple(point[:2].astype(int))
-            cv2.circle(vis_frame, point_2d, self.config.point_size,
-                      self.config.landmark_color, -1)
+        if self.config.point_size <= 1:
+            height, width = vis_frame.shape[:2]
+            inside = ((pts[:, 0] >= 0) & (pts[:, 0] < width) &
+                      (pts[:, 1] >= 0) & (pts[:, 1] < height))
+            vis_frame[pts[inside, 1], pts[inside, 0]] = self.config.landmark_color
+        else:
+            for point_2d in pts.tolist():
+                cv2.circle(vis_frame, point_2d, self.config.point_size,
+                          self.config.landmark_color, -1)
             
         return vis_frame
     
     def draw_face_metrics(self, frame: np.ndarray, metrics: Dict[str, float],
-                         position: Tuple[int, int]) -> np.ndarray:
+                         position: Tuple[int, int],
+                         out: Optional[np.ndarray] = None) -> np.ndarray:
         """Draw facial metrics on frame.
         
         Args:
             frame: Input frame
             metrics: Dictionary of metrics to display
             position: (x, y) position to start drawing text
+            out: Optional buffer shaped like frame to draw into; may be
+                frame itself to draw in place
             
         Returns:
             Frame with metrics drawn
         """
-        vis_frame = frame.copy()
+        vis_frame = self._output_frame(frame, out)
         y_offset = position[1]
         
         for name, value in metrics.items():
@@ -85,7 +114,8 @@ class FeatureVisualizer:
         return vis_frame
     
     def draw_expression(self, frame: np.ndarray, expression: str,
-                       confidence: float, position: Tuple[int, int]) -> np.ndarray:
+                       confidence: float, position: Tuple[int, int],
+                       out: Optional[np.ndarray] = None) -> np.ndarray:
         """Draw expression classification on frame.
         
         Args:
@@ -93,11 +123,13 @@ class FeatureVisualizer:
             expression: Detected expression
             confidence: Confidence score
             position: (x, y) position to draw text
+            out: Optional buffer shaped like frame to draw into; may be
+                frame itself to draw in place
             
         Returns:
             Frame with expression drawn
         """
-        vis_frame = frame.copy()
+        vis_frame = self._output_frame(frame, out)
         
         text = f"Expression: {expression} ({confidence:.2f})"
         cv2.putText(vis_frame, text,
@@ -110,7 +142,7 @@ class FeatureVisualizer:
         return vis_frame
     
     def create_feature_dashboard(self, landmarks: np.ndarray,
-                               metrics: Dict[str, Dict[str, float]]) -> go.Figure:
+                               metrics: Dict[str, Dict[str, float]]) -> 'go.Figure':
         """Create an interactive dashboard of facial features.
         
         Args:
@@ -120,13 +152,16 @@ class FeatureVisualizer:
         Returns:
             Plotly figure object
         """
-        fig = go.Figure()
+        import plotly.graph_objects as go
         
-        # Add 3D scatter plot of landmarks
-        fig.add_trace(go.Scatter3d(
-            x=landmarks[:, 0],
-            y=landmarks[:, 1],
-            z=landmarks[:, 2],
+        # Traces and layout are plain dicts built from our own arrays and
+        # config, so the figure is assembled once without validation
+        xyz = as_f32(landmarks.T)
+        traces = [dict(
+            type='scatter3d',
+            x=xyz[0],
+            y=xyz[1],
+            z=xyz[2],
             mode='markers',
             marker=dict(
                 size=4,
@@ -134,27 +169,26 @@ class FeatureVisualizer:
                 opacity=0.8
             ),
             name='Landmarks'
-        ))
+        )]
         
         # Add metric plots
         for category, values in metrics.items():
             if isinstance(values, dict):
-                fig.add_trace(go.Bar(
+                traces.append(dict(
+                    type='bar',
                     x=list(values.keys()),
                     y=list(values.values()),
                     name=category
                 ))
         
-        # Update layout
-        fig.update_layout(
-            title='Facial Feature Analysis',
+        layout = dict(
+            title=dict(text='Facial Feature Analysis'),
             scene=dict(
-                xaxis_title='X',
-                yaxis_title='Y',
-                zaxis_title='Z'
+                xaxis=dict(title=dict(text='X')),
+                yaxis=dict(title=dict(text='Y')),
+                zaxis=dict(title=dict(text='Z'))
             ),
             height=800,
             showlegend=True
         )
-        
-        return fig
+        return go.Figure(data=traces, layout=layout, _validate=False)
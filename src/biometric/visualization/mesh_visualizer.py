@@ -1,8 +1,14 @@
 """Visualize 3D mesh data and surface properties."""
 import numpy as np
-import plotly.graph_objects as go
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 from dataclasses import dataclass
+from scipy.spatial import cKDTree
+
+from ._plotly_arrays import as_f32, as_i32
+
+# plotly is slow to import, so methods import it when building a figure
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 @dataclass
 class MeshVisualizationConfig:
@@ -13,6 +19,8 @@ class MeshVisualizationConfig:
     colorscale: str = 'Viridis'
     background_color: str = 'rgb(17,17,17)'
     grid_color: str = 'rgb(50,50,50)'
+    max_normals: int = 100
+    max_faces: int = 50000
 
 class MeshVisualizer:
     """Visualizes 3D mesh data and surface properties."""
@@ -25,8 +33,70 @@ class MeshVisualizer:
         """
         self.config = config or MeshVisualizationConfig()
     
+    def _decimate(self, vertices: np.ndarray, faces: np.ndarray,
+                  *vertex_arrays: Optional[np.ndarray]) -> Tuple:
+        """Reduce a mesh to at most config.max_faces faces for display.
+        
+        Meshes within the budget are returned unchanged. Larger ones are
+        simplified with quadric decimation, and per-vertex arrays are
+        resampled from the nearest original vertex.
+        
+        Args:
+            vertices: Nx3 array of vertex coordinates
+            faces: Mx3 array of face indices
+            *vertex_arrays: Optional per-vertex arrays (values, normals, ...)
+            
+        Returns:
+            Tuple of (vertices, faces, *vertex_arrays)
+        """
+        if len(faces) <= self.config.max_faces:
+            return (vertices, faces) + vertex_arrays
+        
+        # open3d is heavy, so it is imported only for meshes that need it
+        import open3d as o3d
+        
+        mesh = o3d.geometry.TriangleMesh(
+            o3d.utility.Vector3dVector(np.asarray(vertices, dtype=np.float64)),
+            o3d.utility.Vector3iVector(np.asarray(faces, dtype=np.int32))
+        )
+        simplified = mesh.simplify_quadric_decimation(
+            target_number_of_triangles=self.config.max_faces
+        )
+        new_vertices = np.asarray(simplified.vertices)
+        new_faces = np.asarray(simplified.triangles)
+        
+        # Carry per-vertex data over from the nearest original vertex
+        _, nearest = cKDTree(vertices).query(new_vertices)
+        resampled = tuple(
+            None if array is None else np.asarray(array)[nearest]
+            for array in vertex_arrays
+        )
+        
+        return (new_vertices, new_faces) + resampled
+    
+    def _layout(self, title: str) -> Dict:
+        """Build the shared dark 3D scene layout.
+        
+        Figures are created unvalidated, so titles use the full {'text': ...}
+        form rather than Plotly's shorthand.
+        """
+        axis = dict(
+            backgroundcolor=self.config.background_color,
+            gridcolor=self.config.grid_color,
+            showbackground=True
+        )
+        return dict(
+            scene=dict(
+                aspectmode='data',
+                xaxis=axis,
+                yaxis=dict(axis),
+                zaxis=dict(axis)
+            ),
+            title=dict(text=title)
+        )
+    
     def create_wireframe_plot(self, vertices: np.ndarray,
-                            edges: List[Tuple[int, int]]) -> go.Figure:
+                            edges: List[Tuple[int, int]]) -> 'go.Figure':
         """Create an interactive wireframe visualization.
         
         Args:
@@ -36,65 +106,55 @@ class MeshVisualizer:
         Returns:
             Plotly figure object
         """
-        fig = go.Figure()
-        
-        # Add vertices
-        fig.add_trace(go.Scatter3d(
-            x=vertices[:, 0],
-            y=vertices[:, 1],
-            z=vertices[:, 2],
-            mode='markers',
-            marker=dict(
-                size=self.config.point_size,
-                color=vertices[:, 2],
-                colorscale=self.config.colorscale,
-                opacity=1
+        import plotly.graph_objects as go
+        
+        # Coordinates as contiguous float32 rows
+        xyz = as_f32(vertices.T)
+        
+        # Edges as one trace; NaN after each segment breaks the line
+        edges_arr = np.asarray(edges, dtype=np.intp).reshape(-1, 2)
+        segments = np.full((3, len(edges_arr), 3), np.nan, dtype=np.float32)
+        segments[:, :, 0] = xyz[:, edges_arr[:, 0]]
+        segments[:, :, 1] = xyz[:, edges_arr[:, 1]]
+        segments = segments.reshape(3, 3 * len(edges_arr))
+        
+        # Traces and layout are plain dicts built from our own arrays and
+        # config, so the figure is assembled once without validation
+        traces = [
+            dict(
+                type='scatter3d',
+                x=xyz[0],
+                y=xyz[1],
+                z=xyz[2],
+                mode='markers',
+                marker=dict(
+                    size=self.config.point_size,
+                    color=xyz[2],
+                    colorscale=self.config.colorscale,
+                    opacity=1
+                ),
+                name='Vertices'
             ),
-            name='Vertices'
-        ))
-        
-        # Add edges
-        for start_idx, end_idx in edges:
-            fig.add_trace(go.Scatter3d(
-                x=[vertices[start_idx, 0], vertices[end_idx, 0]],
-                y=[vertices[start_idx, 1], vertices[end_idx, 1]],
-                z=[vertices[start_idx, 2], vertices[end_idx, 2]],
+            dict(
+                type='scatter3d',
+                x=segments[0],
+                y=segments[1],
+                z=segments[2],
                 mode='lines',
                 line=dict(
                     width=self.config.line_width,
                     color='white'
                 ),
                 showlegend=False
-            ))
-        
-        # Update layout
-        fig.update_layout(
-            scene=dict(
-                aspectmode='data',
-                xaxis=dict(
-                    backgroundcolor=self.config.background_color,
-                    gridcolor=self.config.grid_color,
-                    showbackground=True
-                ),
-                yaxis=dict(
-                    backgroundcolor=self.config.background_color,
-                    gridcolor=self.config.grid_color,
-                    showbackground=True
-                ),
-                zaxis=dict(
-                    backgroundcolor=self.config.background_color,
-                    gridcolor=self.config.grid_color,
-                    showbackground=True
-                )
-            ),
-            title='3D Wireframe Model'
-        )
+            )
+        ]
         
-        return fig
+        return go.Figure(data=traces, layout=self._layout('3D Wireframe Model'),
+                         _validate=False)
     
     def create_surface_plot(self, vertices: np.ndarray, faces: np.ndarray,
                           values: Optional[np.ndarray] = None,
-                          normals: Optional[np.ndarray] = None) -> go.Figure:
+                          normals: Optional[np.ndarray] = None) -> 'go.Figure':
         """Create an interactive surface visualization with optional properties.
         
         Args:
@@ -106,71 +166,58 @@ class MeshVisualizer:
         Returns:
             Plotly figure object
         """
-        fig = go.Figure()
-        
-        # Add surface mesh
-        fig.add_trace(go.Mesh3d(
-            x=vertices[:, 0],
-            y=vertices[:, 1],
-            z=vertices[:, 2],
-            i=faces[:, 0],
-            j=faces[:, 1],
-            k=faces[:, 2],
-            intensity=values if values is not None else vertices[:, 2],
+        import plotly.graph_objects as go
+        
+        # Keep large meshes within the display face budget
+        vertices, faces, values, normals = self._decimate(vertices, faces, values, normals)
+        
+        xyz = as_f32(vertices.T)
+        ijk = as_i32(faces.T)
+        
+        # Surface mesh
+        traces = [dict(
+            type='mesh3d',
+            x=xyz[0],
+            y=xyz[1],
+            z=xyz[2],
+            i=ijk[0],
+            j=ijk[1],
+            k=ijk[2],
+            intensity=as_f32(values) if values is not None else xyz[2],
             colorscale=self.config.colorscale,
             opacity=self.config.surface_opacity,
             name='Surface'
-        ))
+        )]
         
         # Add normal vectors if provided
         if normals is not None:
             # Sample points for normal visualization
             sample_idx = np.random.choice(
                 vertices.shape[0],
-                size=min(100, vertices.shape[0]),
+                size=min(self.config.max_normals, vertices.shape[0]),
                 replace=False
             )
             
             # Add normal vectors as cones
-            fig.add_trace(go.Cone(
-                x=vertices[sample_idx, 0],
-                y=vertices[sample_idx, 1],
-                z=vertices[sample_idx, 2],
-                u=normals[sample_idx, 0],
-                v=normals[sample_idx, 1],
-                w=normals[sample_idx, 2],
+            uvw = as_f32(normals[sample_idx].T)
+            traces.append(dict(
+                type='cone',
+                x=xyz[0, sample_idx],
+                y=xyz[1, sample_idx],
+                z=xyz[2, sample_idx],
+                u=uvw[0],
+                v=uvw[1],
+                w=uvw[2],
                 colorscale=self.config.colorscale,
                 name='Normals'
             ))
         
-        # Update layout
-        fig.update_layout(
-            scene=dict(
-                aspectmode='data',
-                xaxis=dict(
-                    backgroundcolor=self.config.background_color,
-                    gridcolor=self.config.grid_color,
-                    showbackground=True
-                ),
-                yaxis=dict(
-                    backgroundcolor=self.config.background_color,
-                    gridcolor=self.config.grid_color,
-                    showbackground=True
-                ),
-                zaxis=dict(
-                    backgroundcolor=self.config.background_color,
-                    gridcolor=self.config.grid_color,
-                    showbackground=True
-                )
-            ),
-            title='3D Surface Model'
-        )
-        
-        return fig
+        return go.Figure(data=traces, layout=self._layout('3D Surface Model'),
+                         _validate=False)
     
     def create_curvature_plot(self, vertices: np.ndarray,
                             faces: np.ndarray,
-                            curvature: np.ndarray) -> go.Figure:
+                            curvature: np.ndarray) -> 'go.Figure':
         """Create a visualization of surface curvature.
         
         Args:
@@ -181,47 +228,32 @@ class MeshVisualizer:
         Returns:
             Plotly figure object
         """
-        fig = go.Figure()
-        
-        # Add surface colored by curvature
-        fig.add_trace(go.Mesh3d(
-            x=vertices[:, 0],
-            y=vertices[:, 1],
-            z=vertices[:, 2],
-            i=faces[:, 0],
-            j=faces[:, 1],
-            k=faces[:, 2],
-            intensity=curvature,
+        import plotly.graph_objects as go
+        
+        # Keep large meshes within the display face budget
+        vertices, faces, curvature = self._decimate(vertices, faces, curvature)
+        
+        xyz = as_f32(vertices.T)
+        ijk = as_i32(faces.T)
+        
+        # Surface colored by curvature
+        traces = [dict(
+            type='mesh3d',
+            x=xyz[0],
+            y=xyz[1],
+            z=xyz[2],
+            i=ijk[0],
+            j=ijk[1],
+            k=ijk[2],
+            intensity=as_f32(curvature),
             colorscale=self.config.colorscale,
             opacity=self.config.surface_opacity,
             name='Curvature',
             showscale=True,
             colorbar=dict(
-                title='Curvature'
+                title=dict(text='Curvature')
             )
-        ))
-        
-        # Update layout
-        fig.update_layout(
-            scene=dict(
-                aspectmode='data',
-                xaxis=dict(
-                    backgroundcolor=self.config.background_color,
-                    gridcolor=self.config.grid_color,
-                    showbackground=True
-                ),
-                yaxis=dict(
-                    backgroundcolor=self.config.background_color,
-                    gridcolor=self.config.grid_color,
-                    showbackground=True
-                ),
-                zaxis=dict(
-                    backgroundcolor=self.config.background_color,
-                    gridcolor=self.config.grid_color,
-                    showbackground=True
-                )
-            ),
-            title='Surface Curvature Analysis'
-        )
+        )]
         
-        return fig
+        return go.Figure(data=traces, layout=self._layout('Surface Curvature Analysis'),
+                         _validate=False)
@@ -1,8 +1,10 @@
 """Main entry point for biometric analysis application."""
-import os
 import sys
 import time
-from biometric.pipeline import BiometricPipeline
+import webbrowser
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
 from biometric.utils.config import BiometricConfig
 from biometric.utils.session_manager import SessionManager
 
@@ -29,31 +31,51 @@ def list_sessions(session_manager):
     print(f"{'Session ID':<20} {'Timestamp':<20} {'Quality Score':<15}")
     print("-" * 70)
     
-    for session in sessions:
-        print(f"{session['session_id']:<20} "
-              f"{session['timestamp']:<20} "
-              f"{session['quality_score']:<15.2f}")
+    print("\n".join(
+        f"{session['session_id']:<20} "
+        f"{session['timestamp']:<20} "
+        f"{session['quality_score']:<15.2f}"
+        for session in sessions
+    ))
     
     return sessions
 
+def _report_browser_open(dashboard: Path, future):
+    """Warn when a dashboard could not be opened in the browser."""
+    error = future.exception()
+    if error is not None:
+        print(f"Warning: Could not open dashboard {dashboard}: {error}")
+    elif not future.result():
+        print(f"Warning: No browser available to open dashboard: {dashboard}")
+
 def view_session_results(session_id: str):
     """Open visualization dashboards for a session.
     
     Args:
         session_id: Session identifier
     """
-    base_path = f"output/visualization/{session_id}"
+    base_path = Path("output/visualization")
     dashboards = [
-        f"{base_path}_features.html",
-        f"{base_path}_depth.html",
-        f"{base_path}_mesh.html"
+        base_path / f"{session_id}_features.html",
+        base_path / f"{session_id}_depth.html",
+        base_path / f"{session_id}_mesh.html"
     ]
     
+    existing = []
     for dashboard in dashboards:
-        if os.path.exists(dashboard):
-            os.system(f"open {dashboard}")
+        if dashboard.exists():
+            existing.append(dashboard)
         else:
             print(f"Warning: Dashboard not found: {dashboard}")
+    
+    # Open in new tabs concurrently and return to the menu without waiting,
+    # in case the platform browser call blocks
+    if existing:
+        executor = ThreadPoolExecutor(max_workers=len(existing))
+        for dashboard in existing:
+            future = executor.submit(webbrowser.open, dashboard.resolve().as_uri(), new=2)
+            future.add_done_callback(partial(_report_browser_open, dashboard))
+        executor.shutdown(wait=False)
 
 def main():
     """Main application entry point."""
@@ -66,7 +88,9 @@ def main():
         choice = input("\nEnter your choice (1-5): ")
         
         if choice == "1":
-            # Start new analysis
+            # Start new analysis; the pipeline pulls in MediaPipe, OpenCV and
+            # plotly, so it is only imported when an analysis is run
+            from biometric.pipeline import BiometricPipeline
             pipeline = BiometricPipeline(config)
             try:
                 session_id = pipeline.run_full_pipeline()